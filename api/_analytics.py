@@ -0,0 +1,135 @@
+import zlib
+from datetime import date
+
+from _lazy import lazy_import
+from _timerange import _period_start
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Betrachtungszeitraum für GeoPAK10 und die Dividendenjahre
+YEARS = 10
+# Mindestanzahl Kerzen in den ersten 12 Monaten für einen belastbaren Basiskurs
+MIN_BASE_BARS = 10
+
+
+def metrics_stamp(daily, today=None):
+    """Schlüssel, unter dem abgeleitete Kennzahlen neben den Kerzen gespeichert werden.
+
+    Ändert sich mit jeder neuen Kerze, mit dem Kalendertag (Basisfenster) und
+    mit dem Inhalt: Passt Yahoo nach Dividende oder Split alle Kurse neu an,
+    bleiben Länge und letzte Kerze gleich, die Prüfsumme über erste und
+    letzte Schlusskurse, Kurssumme und Dividendensumme aber nicht.
+    """
+    today = today or date.today()
+    last = daily.index[-1].date().isoformat() if len(daily) else None
+    closes = daily['Close'].to_numpy(dtype='float64') if 'Close' in daily.columns else np.empty(0)
+    dividends = daily['Dividends'].to_numpy(dtype='float64') if 'Dividends' in daily.columns else np.empty(0)
+    content = np.array([
+        closes[0] if len(closes) else 0.0,
+        closes[-1] if len(closes) else 0.0,
+        np.nansum(closes),
+        np.nansum(dividends),
+    ])
+    return f'{today.isoformat()}|{len(daily)}|{last}|{zlib.crc32(content.tobytes()):08x}'
+
+
+def yearly_metrics(daily, today=None):
+    """Aus der Tageshistorie abgeleitete, vom aktuellen Kurs unabhängige Kennzahlen.
+
+    Liefert ein JSON-fähiges Dict mit dem Basiskurs (Ø der ersten 12 Monate
+    des 10-Jahres-Fensters), den Jahresschlusskursen und den Dividenden pro
+    Jahr. Alles wird über Arrays bzw. groupby berechnet, nicht pro Jahr über
+    die Kursliste.
+    """
+    today = today or date.today()
+    base_start = _period_start(f'{YEARS}y', today)
+    base_end = _period_start(f'{YEARS - 1}y', today)
+    first_year = today.year - YEARS
+
+    result = {
+        'baseStart': base_start.isoformat(),
+        'baseEnd': base_end.isoformat(),
+        'baseAverage': None,
+        'baseCount': 0,
+        'yearEnd': [],
+        'dividends': [],
+    }
+    if daily.empty:
+        return result
+
+    index = daily.index.tz_localize(None) if daily.index.tz is not None else daily.index
+    days = index.to_numpy().astype('datetime64[D]')
+    years = index.year.to_numpy()
+    closes = daily['Close'].to_numpy(dtype='float64')
+
+    # Basiskurs: Durchschnitt der Schlusskurse im ersten Jahr des Fensters
+    in_base = (days >= np.datetime64(base_start)) & (days <= np.datetime64(base_end)) & ~np.isnan(closes)
+    base_count = int(in_base.sum())
+    result['baseCount'] = base_count
+    if base_count:
+        result['baseAverage'] = float(closes[in_base].mean())
+
+    # Jahresschlusskurse: letzte gültige Kerze je Kalenderjahr
+    valid = ~np.isnan(closes) & (closes > 0) & (years >= first_year)
+    year_end = pd.Series(closes[valid]).groupby(years[valid]).last()
+    result['yearEnd'] = [[int(year), float(close)] for year, close in year_end.items()]
+
+    # Dividenden pro Kalenderjahr
+    if 'Dividends' in daily.columns:
+        amounts = daily['Dividends'].to_numpy(dtype='float64')
+        paid = (amounts > 0) & (years >= first_year)
+        per_year = pd.Series(amounts[paid]).groupby(years[paid]).sum()
+        result['dividends'] = [[int(year), float(amount)] for year, amount in per_year.items()]
+    return result
+
+
+def annual_dividends(yearly):
+    """Dividenden pro Jahr für die Response, neuestes Jahr zuerst."""
+    return [
+        {"year": year, "amount": round(amount, 2)}
+        for year, amount in sorted(yearly['dividends'], reverse=True)
+    ]
+
+
+def dividend_yields(yearly):
+    """Dividendenrendite je Jahr auf Basis des Jahresschlusskurses, älteste zuerst."""
+    year_end = dict(yearly['yearEnd'])
+    yields = []
+    for year, amount in sorted(yearly['dividends']):
+        amount = round(amount, 2)
+        price = year_end.get(year)
+        yields.append({
+            "year": year,
+            "dividend": amount,
+            "price": round(price, 2) if price else 0,
+            "yield": round(amount / price * 100, 2) if price else 0,
+        })
+    return yields
+
+
+def geopak10(yearly, current_price, today=None):
+    """GeoPAK10: geometrische Jahresrendite über 10 Jahre, ohne und mit Dividenden.
+
+    Basis ist der Durchschnittskurs der ersten 12 Monate; für die
+    Gesamtrendite werden die Dividenden des Zeitraums zum aktuellen Kurs
+    addiert. None, wenn die Historie dafür nicht reicht.
+    """
+    base = yearly['baseAverage']
+    if not base or not current_price or yearly['baseCount'] < MIN_BASE_BARS:
+        return None
+    today = today or date.today()
+    first_year = today.year - YEARS
+    total_dividends = sum(round(amount, 2) for year, amount in yearly['dividends']
+                          if first_year <= year <= today.year)
+    price_cagr = (current_price / base) ** (1 / YEARS) - 1
+    total_cagr = ((current_price + total_dividends) / base) ** (1 / YEARS) - 1
+    return {
+        "price": round(price_cagr * 100, 2),
+        "total": round(total_cagr * 100, 2),
+        "baseAverage": round(base, 2),
+        "baseStart": yearly['baseStart'],
+        "baseEnd": yearly['baseEnd'],
+        "totalDividends": round(total_dividends, 2),
+        "years": YEARS,
+    }
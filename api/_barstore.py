@@ -0,0 +1,391 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from _serialize import round2
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = os.environ.get(
+    'BAR_STORE_DIR',
+    os.path.join(tempfile.gettempdir(), 'stockanalyzer_bars')
+)
+# Sekunden, bis ein Symbol erneut bei Yahoo auf neue Kerzen geprüft wird
+DEFAULT_REFRESH = int(os.environ.get('BAR_STORE_REFRESH', 15 * 60))
+# Anzahl bereits gespeicherter Kerzen, die beim Delta-Abruf erneut geladen werden
+DEFAULT_OVERLAP = 5
+
+# Ein Datensatz pro Handelstag, Datum als Tage seit 1970-01-01
+BAR_DTYPE = np.dtype([
+    ('day', '<i4'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<i8'),
+    ('dividends', '<f8'),
+    ('splits', '<f8'),
+])
+FORMAT_VERSION = 1
+
+_COLUMNS = [
+    ('open', 'Open'),
+    ('high', 'High'),
+    ('low', 'Low'),
+    ('close', 'Close'),
+    ('volume', 'Volume'),
+    ('dividends', 'Dividends'),
+    ('splits', 'Stock Splits'),
+]
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def frame_to_records(hist):
+    """Wandelt einen history()-Frame in Datensätze vom Typ BAR_DTYPE."""
+    records = np.zeros(len(hist), dtype=BAR_DTYPE)
+    if hist.empty:
+        return records
+    index = hist.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    days = index.to_numpy().astype('datetime64[D]')
+    records['day'] = (days - _EPOCH).astype('int64')
+    for field, column in _COLUMNS:
+        if column in hist.columns:
+            values = hist[column].to_numpy(dtype='float64')
+            if field == 'volume':
+                values = np.nan_to_num(values)
+            records[field] = values
+    return records
+
+
+def records_to_columns(records):
+    """Kompakte Spalten für den Arbeitsspeicher (weniger als halb so groß wie BAR_DTYPE).
+
+    Tage als int32; Open/High/Low (nur gerundet ausgegeben) als float32,
+    sofern round2() danach dieselben Werte liefert (sonst float64, z.B. bei
+    sehr hohen Kursen). Close bleibt float64, weil Kennzahlen und
+    Indikatoren darauf rechnen. Volumen als int32, falls es passt.
+    Dividenden und Splits sind fast überall 0 und werden nur als
+    (Position, Wert) abgelegt.
+    """
+    columns = {'day': records['day'].astype('int32'), 'close': records['close'].copy()}
+    for field in ('open', 'high', 'low'):
+        values = records[field]
+        compact = values.astype('float32')
+        widened = compact.astype('float64')
+        same = (round2(widened) == round2(values)) | (np.isnan(values) & np.isnan(widened))
+        columns[field] = compact if same.all() else values.copy()
+    volume = records['volume']
+    fits = len(volume) == 0 or (volume.min() >= np.iinfo('int32').min and volume.max() <= np.iinfo('int32').max)
+    columns['volume'] = volume.astype('int32') if fits else volume.copy()
+    for field in ('dividends', 'splits'):
+        positions = np.flatnonzero(records[field] != 0).astype('int32')
+        columns[field] = (positions, records[field][positions].copy())
+    return columns
+
+
+def columns_to_frame(columns, tz=None):
+    """Baut aus kompakten Spalten einen history()-Frame mit float64-Kursen."""
+    index = pd.DatetimeIndex(
+        (_EPOCH + columns['day'].astype('timedelta64[D]')).astype('datetime64[ns]'),
+        name='Date'
+    )
+    if tz:
+        index = index.tz_localize(tz)
+    data = {}
+    for field, column in _COLUMNS:
+        if field in ('dividends', 'splits'):
+            positions, values = columns[field]
+            data[column] = np.zeros(len(index), dtype='float64')
+            data[column][positions] = values
+        elif field == 'volume':
+            data[column] = columns[field].astype('int64')
+        else:
+            data[column] = columns[field].astype('float64')
+    return pd.DataFrame(data, index=index)
+
+
+class BarStore:
+    """Lokaler Tageskerzen-Speicher pro Symbol mit Delta-Abruf.
+
+    Pro Symbol liegen eine Binärdatei mit Datensätzen fester Länge (wird nur
+    angehängt bzw. am Ende abgeschnitten und mit np.fromfile gelesen)
+    und eine kleine JSON-Datei mit Metadaten. Bei einer Abweichung in den erneut
+    geladenen Überlappungskerzen (Split/Dividende verändert adjustierte Kurse)
+    wird die gesamte Historie neu geladen.
+
+    Mit `memory` (ein _memcache.MemoryCache) liegen die Historien zusätzlich
+    als kompakte Spalten im Arbeitsspeicher; frische Einträge kommen dann
+    ohne Dateizugriff. Frames entstehen immer aus den kompakten Spalten,
+    damit Antworten unabhängig von der Herkunft gleich sind.
+    """
+
+    def __init__(self, root=DEFAULT_DIR, refresh_after=DEFAULT_REFRESH, overlap=DEFAULT_OVERLAP, memory=None):
+        self.root = root
+        self.refresh_after = refresh_after
+        self.overlap = overlap
+        self.memory = memory
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._derived = {}
+
+    def history(self, symbol, ticker, max_age=None):
+        """Liefert die gesamte Tageshistorie inkl. Dividenden und Splits.
+
+        `max_age` (Sekunden seit der letzten Prüfung bei Yahoo) ersetzt
+        `refresh_after` für diesen Aufruf, z.B. 0 für einen Delta-Abruf in
+        jedem Fall.
+        """
+        if max_age is None:
+            max_age = self.refresh_after
+        with self._lock_for(symbol):
+            entry = self._recall(symbol)
+            if entry is not None and time.time() - entry['checked'] < max_age:
+                return columns_to_frame(entry['columns'], entry['tz'])
+
+            meta, records = self._load(symbol)
+            if records is None:
+                return self._full_refresh(symbol, ticker)
+
+            if time.time() - meta['checked'] < max_age:
+                return self._frame(symbol, records, meta.get('tz'), meta['checked'])
+
+            try:
+                return self._delta_refresh(symbol, ticker, meta, records)
+            except Exception as e:
+                logger.warning(f"Delta-Abruf für {symbol} fehlgeschlagen, nutze gespeicherte Kerzen: {e}")
+                return self._frame(symbol, records, meta.get('tz'), meta['checked'])
+
+    def cached(self, symbol):
+        """Liefert die gespeicherte Historie, falls sie nicht erneuert werden muss.
+
+        Rückgabe ist ein Tupel (Frame oder None, gespeichert ja/nein), damit
+        Aufrufer fehlende Symbole gesammelt nachladen können.
+        """
+        with self._lock_for(symbol):
+            entry = self._recall(symbol)
+            if entry is not None and time.time() - entry['checked'] < self.refresh_after:
+                return columns_to_frame(entry['columns'], entry['tz']), True
+            meta, records = self._load(symbol)
+            if records is None:
+                return None, False
+            if time.time() - meta['checked'] < self.refresh_after:
+                return self._frame(symbol, records, meta.get('tz'), meta['checked']), True
+            return None, True
+
+    def store(self, symbol, hist):
+        """Speichert eine vollständige, anderweitig geladene Tageshistorie.
+
+        Liefert sie so zurück, wie history() sie liefern würde (aus den kompakten Spalten).
+        """
+        if hist.empty:
+            return hist
+        with self._lock_for(symbol):
+            tz = str(hist.index.tz) if hist.index.tz is not None else None
+            records = frame_to_records(hist)
+            self._write(symbol, records, tz, replace=True)
+            return self._frame(symbol, records, tz, time.time())
+
+    def derived(self, symbol, name, stamp, compute):
+        """Aus den Kerzen abgeleitete Werte, gespeichert neben der Kerzendatei.
+
+        `compute()` läuft nur, wenn für `name` kein Eintrag mit demselben
+        `stamp` vorliegt (z.B. letzte Kerze + Kalendertag); das Ergebnis muss
+        JSON-serialisierbar sein.
+        """
+        key = (symbol, name)
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        path = self._derived_path(symbol)
+        with self._lock_for(symbol):
+            entries = self._read_derived(symbol)
+            entry = entries.get(name)
+            if entry and entry.get('stamp') == stamp:
+                value = entry['value']
+            else:
+                value = compute()
+                entries[name] = {'stamp': stamp, 'value': value}
+                tmp_path = path + '.tmp'
+                try:
+                    os.makedirs(self.root, exist_ok=True)
+                    with open(tmp_path, 'w') as f:
+                        json.dump(entries, f)
+                    os.replace(tmp_path, path)
+                except OSError as e:
+                    logger.warning(f"Kennzahlen für {symbol} nicht schreibbar: {e}")
+        self._derived[key] = (stamp, value)
+        return value
+
+    def derived_cached(self, symbol, name, stamp):
+        """Gespeicherter Wert zu `stamp` oder None, ohne zu rechnen.
+
+        Für Aufrufer, die fehlende Werte gesammelt (z.B. im Prozesspool)
+        berechnen und danach mit derived() ablegen.
+        """
+        key = (symbol, name)
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with self._lock_for(symbol):
+            entry = self._read_derived(symbol).get(name)
+        if not entry or entry.get('stamp') != stamp:
+            return None
+        self._derived[key] = (stamp, entry['value'])
+        return entry['value']
+
+    def _full_refresh(self, symbol, ticker):
+        logger.info(f"Kerzenspeicher: lade volle Historie für {symbol}")
+        hist = ticker.history(period="max", interval="1d", actions=True)
+        if hist.empty:
+            return hist
+        records = frame_to_records(hist)
+        tz = str(hist.index.tz) if hist.index.tz is not None else None
+        self._write(symbol, records, tz, replace=True)
+        return self._frame(symbol, records, tz, time.time())
+
+    def _delta_refresh(self, symbol, ticker, meta, records):
+        overlap = records[-min(self.overlap, len(records)):]
+        first_day = _EPOCH + np.timedelta64(int(overlap['day'][0]), 'D')
+        start = pd.Timestamp(first_day).date()
+        delta = ticker.history(start=start.isoformat(), interval="1d", actions=True)
+        logger.info(f"Kerzenspeicher: Delta für {symbol} ab {start}: {len(delta)} Kerzen")
+
+        if delta.empty:
+            self._write_meta(symbol, meta.get('tz'), int(records['day'][-1]))
+            return self._frame(symbol, records, meta.get('tz'), time.time())
+
+        fresh = frame_to_records(delta)
+        if not self._overlap_matches(overlap, fresh):
+            logger.info(f"Kerzenspeicher: {symbol} wurde neu adjustiert, lade volle Historie")
+            return self._full_refresh(symbol, ticker)
+
+        # Ab dem ersten neu geladenen Tag ersetzen (letzte Kerze kann unvollständig gewesen sein)
+        keep = int(np.searchsorted(records['day'], fresh['day'][0], side='left'))
+        merged = np.concatenate([records[:keep], fresh])
+        self._write(symbol, fresh, meta.get('tz'), truncate_at=keep)
+        return self._frame(symbol, merged, meta.get('tz'), time.time())
+
+    def _overlap_matches(self, stored, fresh):
+        """Vergleicht abgeschlossene Überlappungskerzen und prüft neue Kapitalmaßnahmen."""
+        new_bars = fresh[fresh['day'] > stored['day'][-1]]
+        if np.any(new_bars['splits'] != 0) or np.any(new_bars['dividends'] != 0):
+            return False
+        # Die letzte gespeicherte Kerze kann ein laufender Handelstag gewesen sein
+        settled = stored[:-1]
+        common, stored_idx, fresh_idx = np.intersect1d(settled['day'], fresh['day'], return_indices=True)
+        if len(common) == 0:
+            return len(settled) == 0
+        return bool(np.allclose(
+            settled['close'][stored_idx], fresh['close'][fresh_idx], rtol=1e-6, equal_nan=True
+        ))
+
+    def _frame(self, symbol, records, tz, checked):
+        """Frame über die kompakten Spalten, die dabei im Arbeitsspeicher landen."""
+        return columns_to_frame(self._remember(symbol, records, tz, checked), tz)
+
+    def _remember(self, symbol, records, tz, checked):
+        columns = records_to_columns(records)
+        if self.memory is not None:
+            self.memory.put('bars', symbol, {'tz': tz, 'checked': checked, 'columns': columns})
+        return columns
+
+    def _recall(self, symbol):
+        if self.memory is None:
+            return None
+        return self.memory.get('bars', symbol)
+
+    def _lock_for(self, symbol):
+        with self._locks_lock:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _paths(self, symbol):
+        safe = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        base = os.path.join(self.root, safe)
+        return base + '.bars', base + '.json'
+
+    def _derived_path(self, symbol):
+        bars_path, _ = self._paths(symbol)
+        return bars_path[:-len('.bars')] + '.derived.json'
+
+    def _read_derived(self, symbol):
+        try:
+            with open(self._derived_path(symbol)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load(self, symbol):
+        """Liest Metadaten und Datensätze, (None, None) wenn nichts Brauchbares gespeichert ist."""
+        try:
+            meta = self._read_meta(symbol)
+            records = self._read_records(symbol) if meta else None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Kerzenspeicher für {symbol} unlesbar, lade neu: {e}")
+            return None, None
+        if records is None or len(records) == 0:
+            return None, None
+        return meta, records
+
+    def _read_meta(self, symbol):
+        _, meta_path = self._paths(symbol)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('version') != FORMAT_VERSION:
+            return None
+        return meta
+
+    def _read_records(self, symbol):
+        bars_path, _ = self._paths(symbol)
+        if not os.path.exists(bars_path) or os.path.getsize(bars_path) == 0:
+            return None
+        if os.path.getsize(bars_path) % BAR_DTYPE.itemsize:
+            raise ValueError("unvollständiger Datensatz")
+        return np.fromfile(bars_path, dtype=BAR_DTYPE)
+
+    def _write(self, symbol, records, tz, replace=False, truncate_at=None):
+        """Schreibt Datensätze: komplett ersetzen oder ab `truncate_at` anhängen."""
+        bars_path, _ = self._paths(symbol)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            if replace:
+                tmp_path = bars_path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(records.tobytes())
+                os.replace(tmp_path, bars_path)
+            else:
+                with open(bars_path, 'r+b') as f:
+                    f.truncate(truncate_at * BAR_DTYPE.itemsize)
+                    f.seek(0, os.SEEK_END)
+                    f.write(records.tobytes())
+        except OSError as e:
+            logger.warning(f"Kerzenspeicher für {symbol} nicht schreibbar: {e}")
+            return
+        self._write_meta(symbol, tz, int(records['day'][-1]))
+
+    def _write_meta(self, symbol, tz, last_day):
+        _, meta_path = self._paths(symbol)
+        meta = {
+            'version': FORMAT_VERSION,
+            'tz': tz,
+            'lastDate': str(_EPOCH + np.timedelta64(last_day, 'D')),
+            'checked': time.time(),
+        }
+        tmp_path = meta_path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+        except OSError as e:
+            logger.warning(f"Metadaten für {symbol} nicht schreibbar: {e}")
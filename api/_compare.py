@@ -0,0 +1,187 @@
+import re
+
+from _lazy import lazy_import
+
+np = lazy_import('numpy')
+
+# Fenster der rollierenden Korrelation in Handelstagen
+DEFAULT_WINDOW = 60
+MAX_WINDOW = 1000
+TRADING_DAYS = 252
+
+# Yahoo notiert manche Börsen in Untereinheiten (Pence, Cent, Agorot)
+MINOR_UNITS = {'GBp': ('GBP', 0.01), 'GBX': ('GBP', 0.01), 'ZAc': ('ZAR', 0.01), 'ILA': ('ILS', 0.01)}
+
+_CURRENCY_RE = re.compile(r'^[A-Z]{3}$')
+_EPOCH_DAY = 'datetime64[D]'
+
+
+def parse_window(query_params):
+    """`window=` für die rollierende Korrelation (Handelstage)."""
+    value = (query_params.get('window', [''])[0] or str(DEFAULT_WINDOW)).strip()
+    if not value.isdigit() or not 2 <= int(value) <= MAX_WINDOW:
+        raise ValueError(f"Ungültiges Fenster: '{value}' (erwartet: 2 bis {MAX_WINDOW} Handelstage)")
+    return int(value)
+
+
+def parse_currency(query_params):
+    """`currency=` als ISO-Code (z.B. EUR), None für die Währung des ersten Symbols."""
+    value = (query_params.get('currency', [''])[0] or '').strip().upper()
+    if not value:
+        return None
+    if not _CURRENCY_RE.match(value):
+        raise ValueError(f"Ungültige Währung: '{value}' (erwartet: ISO-Code wie EUR oder USD)")
+    return value
+
+
+def normalize_currency(currency):
+    """(ISO-Code, Faktor) aus info['currency'], z.B. GBp -> (GBP, 0.01)."""
+    if not currency:
+        return None, 1.0
+    if currency in MINOR_UNITS:
+        return MINOR_UNITS[currency]
+    return currency.upper(), 1.0
+
+
+def fx_symbol(source, target):
+    """Yahoo-Symbol für den Kurs `target` pro `source`, z.B. USDEUR=X."""
+    return f'{source}{target}=X'
+
+
+def daily_closes(daily):
+    """(Tage seit 1970 als int64, Schlusskurse) der gültigen Kerzen eines history()-Frames."""
+    index = daily.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    days = index.to_numpy().astype(_EPOCH_DAY).astype('int64')
+    closes = daily['Close'].to_numpy(dtype='float64')
+    valid = ~np.isnan(closes) & (closes > 0)
+    return days[valid], closes[valid]
+
+
+def within(days, values, start=None, end=None):
+    """Nur Tage zwischen `start` und `end` (date, inklusiv, None = offen)."""
+    lo = np.searchsorted(days, _day_number(start), side='left') if start else 0
+    hi = np.searchsorted(days, _day_number(end), side='right') if end else len(days)
+    return days[lo:hi], values[lo:hi]
+
+
+def _day_number(day):
+    return int(np.datetime64(day, 'D').astype('int64'))
+
+
+def align(series):
+    """Richtet [(Tage, Kurse)] auf einen gemeinsamen Kalender aus.
+
+    Kalender ist die Vereinigung aller Handelstage; an Feiertagen einer Börse
+    gilt dort der letzte Schlusskurs weiter. Rückgabe: (Kalender, Kurse T x N
+    mit NaN vor der ersten Kerze, gehandelt T x N).
+    """
+    calendar = np.unique(np.concatenate([days for days, _ in series]))
+    count = len(series)
+    prices = np.full((len(calendar), count), np.nan)
+    traded = np.zeros((len(calendar), count), dtype=bool)
+    for column, (days, closes) in enumerate(series):
+        rows = np.searchsorted(calendar, days)
+        prices[rows, column] = closes
+        traded[rows, column] = True
+    return calendar, forward_fill(prices, traded), traded
+
+
+def forward_fill(values, present):
+    """Füllt Lücken spaltenweise mit dem letzten vorhandenen Wert (führende bleiben NaN)."""
+    rows = np.where(present, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = values[rows, np.arange(values.shape[1])]
+    filled[~np.logical_or.accumulate(present, axis=0)] = np.nan
+    return filled
+
+
+def rates_on(calendar, days, rates):
+    """Wechselkurse auf dem Kalender: letzter bekannter Kurs, davor der erste."""
+    if len(days) == 0:
+        return np.full(len(calendar), np.nan)
+    rows = np.searchsorted(days, calendar, side='right') - 1
+    return rates[np.maximum(rows, 0)]
+
+
+def common_start(traded):
+    """Erste Zeile, ab der jedes Symbol mindestens eine Kerze hat."""
+    return int(np.argmax(traded, axis=0).max())
+
+
+def rebased(prices):
+    """Wertentwicklung auf 100 zum ersten Tag."""
+    return prices / prices[0] * 100.0
+
+
+def log_returns(prices, traded):
+    """Log-Renditen zwischen Tagen, an denen alle Börsen gehandelt haben.
+
+    So fällt die Bewegung über einen Feiertag auf den nächsten gemeinsamen
+    Handelstag statt als Nullrendite in die Korrelation einzugehen.
+    Rückgabe: (Zeilen der Renditen im Kalender, Renditen R x N).
+    """
+    rows = np.flatnonzero(traded.all(axis=1))
+    return rows[1:], np.diff(np.log(prices[rows]), axis=0)
+
+
+def covariance(returns):
+    """Stichproben-Kovarianz der Renditen (N x N), ein Matrixprodukt."""
+    if len(returns) < 2:
+        return np.full((returns.shape[1], returns.shape[1]), np.nan)
+    centered = returns - returns.mean(axis=0)
+    return centered.T @ centered / (len(returns) - 1)
+
+
+def correlation(cov):
+    """Korrelationsmatrix aus der Kovarianz; NaN für Reihen ohne Schwankung."""
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.outer(std, std)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def rolling_correlation(returns, benchmark, window):
+    """Korrelation jeder Spalte mit Spalte `benchmark` über gleitende Fenster.
+
+    Über kumulierte Summen für alle Spalten zugleich (O(R x N) statt
+    O(R x N x window)); Zeile i gehört zum Fenster, das bei Rendite
+    window-1+i endet.
+    """
+    if len(returns) < window:
+        return np.empty((0, returns.shape[1]))
+    x = returns - returns.mean(axis=0)
+    y = x[:, [benchmark]]
+
+    def window_sums(values):
+        sums = np.cumsum(values, axis=0)
+        sums = np.vstack([np.zeros((1, values.shape[1])), sums])
+        return sums[window:] - sums[:-window]
+
+    sx, sy = window_sums(x), window_sums(y)
+    sxx, syy, sxy = window_sums(x * x), window_sums(y * y), window_sums(x * y)
+    numerator = window * sxy - sx * sy
+    denominator = np.sqrt(np.maximum(window * sxx - sx * sx, 0) * np.maximum(window * syy - sy * sy, 0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = numerator / denominator
+    corr[denominator <= 1e-18] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def thin(count, points):
+    """Gleichmäßig verteilte Zeilen (erste und letzte immer dabei), gleich für alle Spalten."""
+    if not points or count <= points:
+        return np.arange(count)
+    return np.unique(np.linspace(0, count - 1, points).round().astype('int64'))
+
+
+def format_days(days):
+    return (np.datetime64('1970-01-01', 'D') + days.astype('timedelta64[D]')).astype(str).tolist()
+
+
+def to_list(values, decimals):
+    """Gerundete Werte als Liste, NaN als None (JSON null)."""
+    rounded = np.round(values, decimals).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded.tolist()
@@ -0,0 +1,108 @@
+import logging
+
+from _lazy import lazy_import
+
+# Schwere Abhängigkeiten erst beim ersten Abruf laden (Kaltstart)
+pd = lazy_import('pandas')
+yf = lazy_import('yfinance')
+
+logger = logging.getLogger(__name__)
+
+
+def parse_symbols(query_params):
+    """Liest `symbols=a,b,c` und/oder wiederholte `symbol=` Parameter."""
+    inputs = []
+    for value in query_params.get('symbols', []) + query_params.get('symbol', []):
+        inputs.extend(part.strip() for part in value.split(','))
+    # Reihenfolge beibehalten, Duplikate entfernen
+    return list(dict.fromkeys(i for i in inputs if i))
+
+
+def bulk_history(symbols, **kwargs):
+    """Lädt die Historie mehrerer Symbole mit einem einzigen yf.download().
+
+    `kwargs` gehen an yf.download() (Zeitraum, Intervall, ggf. session=).
+    """
+    if not symbols:
+        return {}
+    data = yf.download(
+        symbols, group_by='ticker', actions=True, auto_adjust=True,
+        threads=True, progress=False, **kwargs
+    )
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    for symbol in symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            frame = data[symbol]
+        elif len(symbols) == 1:
+            frame = data
+        else:
+            continue
+        # Gemeinsamer Index über alle Börsen: Tage ohne Kurse des Symbols entfernen
+        frame = frame.dropna(subset=['Open', 'High', 'Low', 'Close'], how='all')
+        if not frame.empty:
+            frames[symbol] = frame
+    return frames
+
+
+def load_daily_histories(pool, store, symbols, tickers, **upstream):
+    """Tageshistorien aus dem Kerzenspeicher `store`, fehlende gesammelt per Bulk-Download.
+
+    `tickers` (Symbol -> yf.Ticker) dient für Delta- und Einzelabrufe,
+    `upstream` geht an yf.download() (z.B. session=).
+    """
+    frames = {}
+    pending = {}
+    missing = []
+    for symbol in symbols:
+        frame, stored = store.cached(symbol)
+        if frame is not None:
+            frames[symbol] = frame
+        elif stored:
+            # Veraltet: nur das Delta nachladen
+            pending[symbol] = pool.submit(store.history, symbol, tickers[symbol])
+        else:
+            missing.append(symbol)
+
+    bulk = pool.submit(bulk_history, missing, period='max', interval='1d', **upstream) if missing else None
+    for symbol, future in pending.items():
+        try:
+            frames[symbol] = future.result()
+        except Exception as e:
+            logger.warning(f"Historie für {symbol} fehlgeschlagen: {e}")
+    if bulk is not None:
+        try:
+            # Über den Kerzenspeicher, damit die Frames wie beim Einzelabruf aussehen
+            for symbol, frame in bulk.result().items():
+                frames[symbol] = store.store(symbol, frame)
+        except Exception as e:
+            # Ein fehlerhaftes Symbol soll nicht alle anderen mitreißen: einzeln nachladen
+            logger.warning(f"Bulk-Download für {len(missing)} Symbole fehlgeschlagen, lade einzeln: {e}")
+            single = {symbol: pool.submit(store.history, symbol, tickers[symbol]) for symbol in missing}
+            for symbol, future in single.items():
+                try:
+                    frame = future.result()
+                except Exception as e:
+                    logger.warning(f"Historie für {symbol} fehlgeschlagen: {e}")
+                    continue
+                if not frame.empty:
+                    frames[symbol] = frame
+    return frames
+
+
+def load_histories(pool, store, symbols, prewarmer=None, **upstream):
+    """Tageshistorien: heiße Symbole aus dem Vorwärm-Speicher, der Rest über den Kerzenspeicher."""
+    frames = {}
+    rest = []
+    for symbol in symbols:
+        hot = prewarmer.get(symbol) if prewarmer is not None else None
+        if hot is not None:
+            frames[symbol] = hot[1]
+        else:
+            rest.append(symbol)
+    tickers = {symbol: yf.Ticker(symbol, **upstream) for symbol in rest}
+    frames.update(load_daily_histories(pool, store, rest, tickers, **upstream))
+    return frames
@@ -0,0 +1,235 @@
+import gzip
+import hashlib
+import json
+import zlib
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MARKET_TZ = 'Europe/Berlin'
+# Xetra öffnet 9:00, die US-Börsen schließen 22:00 deutscher Zeit
+MARKET_OPEN_HOUR = 9
+MARKET_CLOSE_HOUR = 22
+
+# Cache-Zeiten in Sekunden: (max-age, s-maxage, stale-while-revalidate)
+CACHE_MARKET_OPEN = (60, 60, 300)
+CACHE_MARKET_CLOSED = (900, 3600, 86400)
+
+# Kleine Antworten lohnen die Komprimierung nicht
+MIN_COMPRESS_SIZE = 1024
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, If-None-Match',
+    'Access-Control-Expose-Headers': 'ETag, Server-Timing',
+    'Timing-Allow-Origin': '*',
+}
+
+
+def is_market_open(now=None):
+    """Grobe Handelszeit (Mo-Fr 9-22 Uhr deutscher Zeit) über Xetra und US-Börsen."""
+    if now is None:
+        try:
+            now = datetime.now(ZoneInfo(MARKET_TZ))
+        except ZoneInfoNotFoundError:
+            # Ohne Zeitzonendaten: MEZ als Näherung
+            now = datetime.now(timezone(timedelta(hours=1)))
+    return now.weekday() < 5 and MARKET_OPEN_HOUR <= now.hour < MARKET_CLOSE_HOUR
+
+
+def cache_control(now=None):
+    """Cache-Control passend zur Handelszeit: kurz während, lang außerhalb."""
+    max_age, s_maxage, swr = CACHE_MARKET_OPEN if is_market_open(now) else CACHE_MARKET_CLOSED
+    return f'public, max-age={max_age}, s-maxage={s_maxage}, stale-while-revalidate={swr}'
+
+
+def make_etag(body):
+    """ETag aus dem Hash des unkomprimierten Bodys.
+
+    Schwach (W/), weil derselbe Inhalt gzip-, br- oder unkomprimiert
+    ausgeliefert wird.
+    """
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """Schwacher Vergleich nach RFC 7232 gegen alle Tags in If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith('W/') else tag) == opaque:
+            return True
+    return False
+
+
+def _accepted(accept_encoding):
+    """Liest Accept-Encoding in ein Dict Kodierung -> q-Wert."""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding):
+    """Wählt br (falls installiert) vor gzip, sonst unkomprimiert."""
+    accepted = _accepted(accept_encoding)
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def _start_response(handler, status):
+    # Gemerkt wird das Header-Objekt der Anfrage, das http.server pro Anfrage
+    # neu anlegt; so gilt die Markierung nicht für die nächste Keep-Alive-Anfrage
+    handler._response_for = handler.headers
+    handler.send_response(status)
+
+
+def response_started(handler):
+    """True, wenn für die laufende Anfrage schon Statuszeile und Header gesendet wurden."""
+    return getattr(handler, '_response_for', None) is handler.headers
+
+
+def compress_variants(body):
+    """Alle unterstützten Kodierungen eines Bodys vorab (leer unter MIN_COMPRESS_SIZE)."""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return {}
+    encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+    return {encoding: compress(body, encoding) for encoding in encodings}
+
+
+def send_body(handler, body, content_type='application/json', cache=False, etag=None, headers=None,
+              variants=None):
+    """Sendet einen fertigen Body mit ETag/304, Cache-Control und Komprimierung.
+
+    `cache=False` (Fehler, Leerantworten) setzt no-store und verzichtet auf ETag.
+    `headers` (z.B. Server-Timing) gehen auch mit einer 304-Antwort raus.
+    `variants` (Kodierung -> komprimierter Body, z.B. aus compress_variants())
+    wird nur gelesen; fehlende Kodierungen werden pro Anfrage komprimiert.
+    """
+    extra = headers or {}
+    headers = dict(CORS_HEADERS, **extra)
+    headers['Content-Type'] = content_type
+    headers['Vary'] = 'Accept-Encoding'
+
+    if cache:
+        etag = etag or make_etag(body)
+        headers['ETag'] = etag
+        headers['Cache-Control'] = cache_control()
+        if etag_matches(handler.headers.get('If-None-Match'), etag):
+            _start_response(handler, 304)
+            for name in ('ETag', 'Cache-Control', 'Vary', 'Access-Control-Allow-Origin',
+                         'Access-Control-Expose-Headers', *extra):
+                handler.send_header(name, headers[name])
+            handler.end_headers()
+            return
+    else:
+        headers['Cache-Control'] = 'no-store'
+
+    encoding = None
+    if len(body) >= MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding(handler.headers.get('Accept-Encoding'))
+    if encoding:
+        compressed = variants.get(encoding) if variants is not None else None
+        body = compressed if compressed is not None else compress(body, encoding)
+        headers['Content-Encoding'] = encoding
+    headers['Content-Length'] = str(len(body))
+
+    _start_response(handler, 200)
+    for name, value in headers.items():
+        handler.send_header(name, value)
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def send_stream(handler, chunks, content_type='application/x-ndjson', cache=False, headers=None):
+    """Sendet Bytes-Blöcke aus einem Iterator per Chunked Transfer-Encoding.
+
+    Jeder Block geht sofort raus (gzip mit Sync-Flush, falls akzeptiert),
+    damit der Client früh rendern kann. Ohne HTTP/1.1 auf beiden Seiten
+    wird ohne Chunking bis zum Verbindungsende geschrieben. Einen ETag gibt es
+    nicht, weil der Inhalt erst beim Senden entsteht.
+    """
+    chunked = handler.protocol_version == handler.request_version == 'HTTP/1.1'
+    gzip_ok = _accepted(handler.headers.get('Accept-Encoding')).get('gzip', 0) > 0
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip_ok else None
+
+    _start_response(handler, 200)
+    for name, value in dict(CORS_HEADERS, **(headers or {})).items():
+        handler.send_header(name, value)
+    handler.send_header('Content-Type', content_type)
+    handler.send_header('Vary', 'Accept-Encoding')
+    handler.send_header('Cache-Control', cache_control() if cache else 'no-store')
+    if compressor:
+        handler.send_header('Content-Encoding', 'gzip')
+    if chunked:
+        handler.send_header('Transfer-Encoding', 'chunked')
+    else:
+        handler.send_header('Connection', 'close')
+        handler.close_connection = True
+    handler.end_headers()
+
+    def write(data):
+        if not data:
+            return
+        if chunked:
+            handler.wfile.write(b'%x\r\n' % len(data) + data + b'\r\n')
+        else:
+            handler.wfile.write(data)
+        handler.wfile.flush()
+
+    for chunk in chunks:
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        write(chunk)
+    if compressor:
+        write(compressor.flush())
+    if chunked:
+        handler.wfile.write(b'0\r\n\r\n')
+
+
+def send_json(handler, payload, cache=False, headers=None):
+    """Serialisiert `payload` und sendet es über send_body()."""
+    send_body(handler, json.dumps(payload).encode('utf-8'), cache=cache, headers=headers)
+
+
+def send_server_error(handler, message, headers=None):
+    """Fehlerantwort nach einer Ausnahme, sofern noch nichts gesendet wurde.
+
+    Stehen Header oder Teile eines Streams schon auf der Leitung, würde eine
+    zweite Antwort im Body landen; dann wird nur die Verbindung geschlossen,
+    und der Client erkennt den Abbruch am fehlenden Ende (Chunk bzw. Länge).
+    """
+    if response_started(handler):
+        handler.close_connection = True
+        return
+    send_json(handler, {'error': message}, headers=headers)
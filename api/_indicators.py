@@ -0,0 +1,297 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from _lazy import lazy_import
+from _serialize import round2
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Name -> Standardperiode (None = ohne Periode)
+INDICATORS = {
+    'sma': 20,
+    'ema': 20,
+    'rsi': 14,
+    'macd': None,
+    'bb': 20,
+    'vol': 20,
+    'drawdown': None,
+}
+MAX_INDICATORS = 12
+MAX_WINDOW = 1000
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BOLLINGER_WIDTH = 2.0
+TRADING_DAYS = 252
+
+# Symbole, deren Zwischenstände im warmen Prozess gehalten werden
+DEFAULT_MAX_SYMBOLS = int(os.environ.get('INDICATOR_CACHE_MAX_SYMBOLS', 64))
+# Wie viele der zuletzt berechneten Kerzen sich ändern dürfen, ohne neu zu rechnen
+MAX_REWRITE = 10
+
+_SPEC_RE = re.compile(r'^([a-z]+)(\d*)$')
+
+
+def parse_indicators(query_params):
+    """Liest `indicators=sma50,ema20,rsi,macd,...` in eine Liste (name, periode).
+
+    Wirft ValueError mit einer Meldung für den Client bei ungültigen Werten.
+    """
+    raw = query_params.get('indicators', [None])[0]
+    if not raw:
+        return []
+    specs = []
+    for part in raw.split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        match = _SPEC_RE.match(part)
+        if not match or match.group(1) not in INDICATORS:
+            raise ValueError(f"Unbekannter Indikator: '{part}' (erlaubt: {', '.join(INDICATORS)})")
+        name, digits = match.groups()
+        default = INDICATORS[name]
+        if default is None:
+            if digits:
+                raise ValueError(f"Indikator '{name}' hat keine Periode")
+            period = None
+        else:
+            period = int(digits) if digits else default
+            if not 2 <= period <= MAX_WINDOW:
+                raise ValueError(f"Periode für '{name}' muss zwischen 2 und {MAX_WINDOW} liegen")
+        if (name, period) not in specs:
+            specs.append((name, period))
+    if len(specs) > MAX_INDICATORS:
+        raise ValueError(f"Maximal {MAX_INDICATORS} Indikatoren pro Anfrage")
+    return specs
+
+
+def spec_key(spec):
+    name, period = spec
+    return f'{name}{period}' if period else name
+
+
+# Rohreihen: jede Funktion rechnet ab Position `start` und übernimmt davor die
+# Werte aus `prev`, sodass angehängte Kerzen ohne Neuberechnung auskommen.
+
+def _ema(values, alpha, start=0, prev=None):
+    """Exponentieller Durchschnitt (adjust=False), ab `start` mit prev[start-1] als Saat."""
+    if prev is None or start == 0:
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    seeded = np.concatenate(([prev[start - 1]], values[start:]))
+    tail = pd.Series(seeded).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+    return np.concatenate((prev[:start], tail))
+
+
+def _resume(n, start, prev):
+    out = np.full(n, np.nan)
+    if prev is not None and start:
+        out[:start] = prev[:start]
+    return out
+
+
+def _rolling_mean(values, window, start=0, prev=None):
+    """Gleitender Durchschnitt über Kumulativsummen, nur für Positionen ab `start`."""
+    out = _resume(len(values), start, prev)
+    first = max(start, window - 1)
+    if first < len(values):
+        csum = np.cumsum(np.concatenate(([0.0], values[first - window + 1:])))
+        out[first:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def _rolling_std(values, window, start=0, prev=None):
+    """Gleitende Standardabweichung (ddof=1), ab `start`.
+
+    Über pandas' rolling (numerisch stabil, in C); Kumulativsummen der
+    Quadrate verlieren bei langen Kursreihen zu viel Genauigkeit.
+    """
+    out = _resume(len(values), start, prev)
+    first = max(start, window - 1)
+    if first < len(values):
+        segment = pd.Series(values[first - window + 1:])
+        out[first:] = segment.rolling(window).std().to_numpy()[window - 1:]
+    return out
+
+
+def _sma(closes, period, start, prev):
+    return {'sma': _rolling_mean(closes, period, start, prev and prev['sma'])}
+
+
+def _ema_raw(closes, period, start, prev):
+    return {'ema': _ema(closes, 2.0 / (period + 1), start, prev and prev['ema'])}
+
+
+def _rsi(closes, period, start, prev):
+    change = np.diff(closes, prepend=closes[0])
+    gains = np.where(change > 0, change, 0.0)
+    losses = np.where(change < 0, -change, 0.0)
+    alpha = 1.0 / period
+    return {
+        'gain': _ema(gains, alpha, start, prev and prev['gain']),
+        'loss': _ema(losses, alpha, start, prev and prev['loss']),
+    }
+
+
+def _macd(closes, period, start, prev):
+    fast = _ema(closes, 2.0 / (MACD_FAST + 1), start, prev and prev['fast'])
+    slow = _ema(closes, 2.0 / (MACD_SLOW + 1), start, prev and prev['slow'])
+    signal = _ema(fast - slow, 2.0 / (MACD_SIGNAL + 1), start, prev and prev['signal'])
+    return {'fast': fast, 'slow': slow, 'signal': signal}
+
+
+def _bollinger(closes, period, start, prev):
+    return {
+        'mid': _rolling_mean(closes, period, start, prev and prev['mid']),
+        'std': _rolling_std(closes, period, start, prev and prev['std']),
+    }
+
+
+def _volatility(closes, period, start, prev):
+    returns = np.diff(np.log(closes), prepend=np.nan)
+    # Die erste Rendite fehlt; Fenster beginnen daher eine Kerze später
+    std = _rolling_std(returns, period, start, prev and prev['std'])
+    return {'std': std}
+
+
+def _drawdown(closes, period, start, prev):
+    if prev is None or start == 0:
+        return {'peak': np.maximum.accumulate(closes)}
+    tail = np.maximum.accumulate(np.concatenate(([prev['peak'][start - 1]], closes[start:])))[1:]
+    return {'peak': np.concatenate((prev['peak'][:start], tail))}
+
+
+_RAW = {
+    'sma': _sma,
+    'ema': _ema_raw,
+    'rsi': _rsi,
+    'macd': _macd,
+    'bb': _bollinger,
+    'vol': _volatility,
+    'drawdown': _drawdown,
+}
+
+
+def _outputs(spec, raw, closes):
+    """Ausgabereihen eines Indikators aus seinen Rohreihen."""
+    name, period = spec
+    if name == 'sma':
+        return {'value': raw['sma']}
+    if name == 'ema':
+        return {'value': raw['ema']}
+    if name == 'rsi':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(raw['loss'] == 0, 100.0, 100.0 - 100.0 / (1.0 + raw['gain'] / raw['loss']))
+        rsi[:period] = np.nan
+        return {'value': rsi}
+    if name == 'macd':
+        macd = raw['fast'] - raw['slow']
+        return {'macd': macd, 'signal': raw['signal'], 'histogram': macd - raw['signal']}
+    if name == 'bb':
+        width = BOLLINGER_WIDTH * raw['std']
+        return {'middle': raw['mid'], 'upper': raw['mid'] + width, 'lower': raw['mid'] - width}
+    if name == 'vol':
+        return {'value': raw['std'] * np.sqrt(TRADING_DAYS) * 100}
+    return {'value': (closes / raw['peak'] - 1.0) * 100}
+
+
+def _to_list(values):
+    """Gerundete Werte als JSON-Liste, fehlende Werte als None."""
+    rounded = round2(values)
+    return [None if v != v else v for v in rounded.tolist()]
+
+
+class IndicatorEngine:
+    """Technische Indikatoren über die Tagesschlusskurse eines Symbols.
+
+    Pro Symbol werden Tage, Schlusskurse und die Rohreihen jedes bereits
+    berechneten Indikators gehalten (LRU über `max_symbols`). Kommen bei
+    einem späteren Aufruf nur Kerzen hinzu oder ändert sich die letzte
+    Kerze, wird ab der ersten abweichenden Position weitergerechnet;
+    größere Abweichungen (Split-Adjustierung) führen zur Neuberechnung.
+    """
+
+    def __init__(self, max_symbols=DEFAULT_MAX_SYMBOLS):
+        self.max_symbols = max_symbols
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compute(self, symbol, daily, specs):
+        """Liefert (Tage, Schlusskurse, {Schlüssel: Rohreihen}) für die gewünschten Indikatoren."""
+        days, closes = self._series(daily)
+        with self._lock:
+            state = self._states.get(symbol)
+            start = self._resume_at(state, days, closes)
+            fresh = state is None or start == 0
+            unchanged = not fresh and start == len(days) == len(state['days'])
+            cached = {} if fresh else state['raw']
+
+            raw = {}
+            for spec in specs:
+                key = spec_key(spec)
+                prev = cached.get(key)
+                if prev is not None and unchanged:
+                    raw[key] = prev
+                elif prev is None:
+                    raw[key] = _RAW[spec[0]](closes, spec[1], 0, None)
+                else:
+                    raw[key] = _RAW[spec[0]](closes, spec[1], start, prev)
+
+            # Bei geänderten Kerzen passen nicht angefragte Indikatoren nicht mehr
+            self._states[symbol] = {
+                'days': days,
+                'closes': closes,
+                'raw': {**cached, **raw} if unchanged else raw,
+            }
+            self._states.move_to_end(symbol)
+            while len(self._states) > self.max_symbols:
+                self._states.popitem(last=False)
+        return days, closes, raw
+
+    def for_columns(self, symbol, daily, specs, columns):
+        """Indikatoren an den Zeitpunkten einer (ggf. reduzierten) Kursreihe aus price_columns().
+
+        Basis sind immer die Tageskerzen; bei Intraday-Reihen gibt es keine Werte.
+        """
+        if not specs or columns['unit'] != 'D' or daily.empty:
+            return None
+        days, closes, raw = self.compute(symbol, daily, specs)
+        pos = np.clip(np.searchsorted(days, columns['time']), 0, max(len(days) - 1, 0))
+        found = days[pos] == columns['time'] if len(days) else np.zeros(len(columns['time']), bool)
+        result = {}
+        for spec in specs:
+            key = spec_key(spec)
+            outputs = _outputs(spec, raw[key], closes)
+            picked = {}
+            for name, values in outputs.items():
+                values = np.where(found, values[pos], np.nan) if len(days) else np.full(len(pos), np.nan)
+                picked[name] = _to_list(values)
+            result[key] = picked['value'] if list(picked) == ['value'] else picked
+        return result
+
+    @staticmethod
+    def _series(daily):
+        """Tage seit 1970 und Schlusskurse der gültigen Tageskerzen."""
+        closes = daily['Close'].to_numpy(dtype='float64')
+        valid = ~np.isnan(closes) & (closes > 0)
+        index = daily.index.tz_localize(None) if daily.index.tz is not None else daily.index
+        days = index.to_numpy().astype('datetime64[D]').astype('int64')
+        return days[valid], closes[valid]
+
+    @staticmethod
+    def _resume_at(state, days, closes):
+        """Erste Position, ab der neu gerechnet werden muss (0 = alles)."""
+        if state is None:
+            return 0
+        old_days, old_closes = state['days'], state['closes']
+        common = min(len(old_days), len(days))
+        if common == 0:
+            return 0
+        differs = np.flatnonzero(
+            (old_days[:common] != days[:common])
+            | ~np.isclose(old_closes[:common], closes[:common], rtol=1e-9, atol=0)
+        )
+        first = int(differs[0]) if len(differs) else common
+        if first < len(old_days) - MAX_REWRITE:
+            return 0
+        return first
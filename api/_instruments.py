@@ -0,0 +1,124 @@
+import csv
+import difflib
+import os
+import re
+import unicodedata
+import logging
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.environ.get(
+    'INSTRUMENT_INDEX_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '_instruments.csv')
+)
+
+# Rechtsformen und Zusätze, die bei Namenssuchen ignoriert werden
+_NAME_STOPWORDS = {
+    'AG', 'SE', 'INC', 'CORP', 'CORPORATION', 'CO', 'KGAA', 'NV', 'PLC',
+    'SA', 'LTD', 'THE', 'COMPANY', 'GROUP', 'VZ', 'CLASS', 'A',
+}
+
+_UMLAUTS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'Ä': 'Ae', 'Ö': 'Oe', 'Ü': 'Ue', 'ß': 'ss'})
+
+
+def normalize(text):
+    """Großschreibung ohne Akzente und Sonderzeichen (Punkt bleibt für Symbole)."""
+    text = text.translate(_UMLAUTS)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[^A-Z0-9.]+', ' ', text.upper()).split())
+
+
+def normalize_name(name):
+    """Normalisierter Firmenname ohne Rechtsform, z.B. 'Allianz SE' -> 'ALLIANZ'."""
+    words = [w.strip('.') for w in normalize(name).split()]
+    return ' '.join(w for w in words if w and w not in _NAME_STOPWORDS)
+
+
+class InstrumentIndex:
+    """Lokaler Index über Symbol, WKN, ISIN und Firmenname.
+
+    Exakte Treffer laufen über Dicts, Präfixsuche über eine sortierte
+    Schlüsselliste mit bisect; ohne Präfixtreffer wird unscharf über die
+    Namen gesucht (difflib).
+    """
+
+    def __init__(self, instruments):
+        self.instruments = instruments
+        self._identifiers = {}
+        self._names = {}
+        fuzzy = {}
+        pairs = []
+        for i, item in enumerate(instruments):
+            for key in (item['symbol'], item['wkn'], item['isin']):
+                if key:
+                    self._identifiers[key.upper()] = i
+                    pairs.append((key.upper(), i))
+            name = normalize_name(item['name'])
+            if name:
+                self._names.setdefault(name, i)
+                pairs.append((name, i))
+                fuzzy.setdefault(name, i)
+                for word in name.split():
+                    pairs.append((word, i))
+                    if len(word) >= 3:
+                        fuzzy.setdefault(word, i)
+        pairs.sort()
+        self._fuzzy = fuzzy
+        self._fuzzy_keys = list(fuzzy)
+        self._keys = [key for key, _ in pairs]
+        self._refs = [i for _, i in pairs]
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """Lädt den Index aus einer CSV-Datei (symbol,name,wkn,isin)."""
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                instruments = [
+                    {
+                        'symbol': row['symbol'].strip(),
+                        'name': row['name'].strip(),
+                        'wkn': (row.get('wkn') or '').strip() or None,
+                        'isin': (row.get('isin') or '').strip() or None,
+                    }
+                    for row in csv.DictReader(f)
+                    if row.get('symbol')
+                ]
+        except OSError as e:
+            logger.warning(f"Instrument-Index '{path}' nicht lesbar: {e}")
+            instruments = []
+        return cls(instruments)
+
+    def lookup(self, query):
+        """Exakter Treffer auf Symbol, WKN oder ISIN."""
+        i = self._identifiers.get(query.strip().upper())
+        return self.instruments[i]['symbol'] if i is not None else None
+
+    def lookup_name(self, query):
+        """Exakter Treffer auf den normalisierten Firmennamen."""
+        i = self._names.get(normalize_name(query))
+        return self.instruments[i]['symbol'] if i is not None else None
+
+    def search(self, query, limit=10):
+        """Präfixsuche für Autocomplete, unscharf als Fallback."""
+        q = normalize(query)
+        if not q:
+            return []
+        found = []
+        seen = set()
+        pos = bisect_left(self._keys, q)
+        while pos < len(self._keys) and self._keys[pos].startswith(q) and len(found) < limit:
+            i = self._refs[pos]
+            if i not in seen:
+                seen.add(i)
+                found.append(self.instruments[i])
+            pos += 1
+
+        if not found:
+            for key in difflib.get_close_matches(normalize_name(query), self._fuzzy_keys, n=limit, cutoff=0.7):
+                i = self._fuzzy[key]
+                if i not in seen:
+                    seen.add(i)
+                    found.append(self.instruments[i])
+        return found
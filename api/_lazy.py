@@ -0,0 +1,49 @@
+import importlib.util
+import sys
+import threading
+
+
+def lazy_import(name):
+    """Importiert ein Modul erst beim ersten Attributzugriff.
+
+    Für schwere Abhängigkeiten (yfinance, pandas, numpy), die bei
+    Kaltstarts sonst schon vor dem Parsen der Anfrage geladen würden.
+    Ist das Modul bereits geladen (oder z.B. im Benchmark ersetzt),
+    wird es unverändert zurückgegeben. Sonst kommt ein LazyObject, das
+    den Import genau einmal unter einem Lock ausführt
+    (importlib.util.LazyLoader ist nicht threadsicher: parallele Threads
+    sehen dort ein halb initialisiertes Modul).
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if importlib.util.find_spec(name) is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    return LazyObject(lambda: importlib.import_module(name))
+
+
+class LazyObject:
+    """Platzhalter für modulweiten Zustand, der erst bei Benutzung erzeugt wird.
+
+    Leitet Attributzugriffe an das Ergebnis von `factory()` weiter; die
+    Erzeugung läuft genau einmal, auch bei parallelen Threads. Eigene
+    Attribute beginnen mit '_', damit sie keine Methoden des Objekts
+    (z.B. SymbolCache.get) verdecken.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
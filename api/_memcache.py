@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Speicherbudget der warmen Instanz in MB (Kerzen, info, fertige Antworten zusammen)
+DEFAULT_BUDGET = int(float(os.environ.get('MEMORY_CACHE_MB', 64)) * 1024 * 1024)
+# Einträge über budget / MAX_ITEM_SHARE werden nicht aufgenommen, damit ein
+# einzelner großer Wert nicht den halben Cache verdrängt
+MAX_ITEM_SHARE = 8
+
+
+def measure(value):
+    """Geschätzter Speicherbedarf in Bytes (NumPy-Arrays über nbytes, Rest rekursiv)."""
+    nbytes = getattr(value, 'nbytes', None)
+    if nbytes is not None:
+        return int(nbytes) + 112
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(measure(k) + measure(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(measure(v) for v in value)
+    return size
+
+
+class MemoryCache:
+    """LRU über mehrere Arten von Einträgen mit gemeinsamem Byte-Budget.
+
+    Schlüssel sind (Art, Schlüssel); gezählt wird pro Art (Treffer, Fehlgriffe,
+    Verdrängungen, abgelehnte Einträge, Bytes). Einträge können ein Ablaufdatum
+    haben (`ttl` in Sekunden), abgelaufene zählen als Fehlgriff.
+    Die Werte werden geteilt, nicht kopiert, und dürfen nicht verändert werden.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.size = 0
+        self._items = OrderedDict()
+        self._kinds = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats(kind)
+            item = self._items.get((kind, key))
+            if item is None or (item[2] is not None and item[2] <= now):
+                if item is not None:
+                    self._remove((kind, key))
+                stats['misses'] += 1
+                return default
+            self._items.move_to_end((kind, key))
+            stats['hits'] += 1
+            return item[0]
+
+    def put(self, kind, key, value, ttl=None, size=None):
+        """Legt einen Wert ab; False, wenn er allein das Budget sprengen würde."""
+        size = measure(value) if size is None else size
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            stats = self._stats(kind)
+            if (kind, key) in self._items:
+                self._remove((kind, key))
+            if size > self.budget // MAX_ITEM_SHARE:
+                stats['rejected'] += 1
+                return False
+            self._items[(kind, key)] = (value, size, expires)
+            self.size += size
+            stats['bytes'] += size
+            stats['items'] += 1
+            self._evict()
+        return True
+
+    def discard(self, kind, key):
+        with self._lock:
+            if (kind, key) in self._items:
+                self._remove((kind, key))
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+            for stats in self._kinds.values():
+                stats['bytes'] = stats['items'] = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'budget': self.budget,
+                'bytes': self.size,
+                'items': len(self._items),
+                'kinds': {kind: dict(stats) for kind, stats in self._kinds.items()},
+            }
+
+    def _stats(self, kind):
+        stats = self._kinds.get(kind)
+        if stats is None:
+            stats = self._kinds[kind] = {
+                'hits': 0, 'misses': 0, 'evictions': 0, 'rejected': 0, 'bytes': 0, 'items': 0,
+            }
+        return stats
+
+    def _remove(self, full_key):
+        _, size, _ = self._items.pop(full_key)
+        self.size -= size
+        stats = self._kinds[full_key[0]]
+        stats['bytes'] -= size
+        stats['items'] -= 1
+
+    def _evict(self):
+        while self.size > self.budget and self._items:
+            full_key = next(iter(self._items))
+            self._remove(full_key)
+            self._kinds[full_key[0]]['evictions'] += 1
@@ -0,0 +1,235 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from _http import is_market_open
+
+logger = logging.getLogger(__name__)
+
+# Abstand zwischen zwei Abrufen eines heißen Symbols in Sekunden,
+# während bzw. außerhalb der Handelszeit seiner Börse
+DEFAULT_OPEN_INTERVAL = int(os.environ.get('PREWARM_OPEN_INTERVAL', 60))
+DEFAULT_CLOSED_INTERVAL = int(os.environ.get('PREWARM_CLOSED_INTERVAL', 3600))
+# Gleichzeitige Hintergrundabrufe (eigener Pool, Anfragen behalten UPSTREAM_POOL)
+DEFAULT_WORKERS = int(os.environ.get('PREWARM_WORKERS', 4))
+# Längste Pause der Schleife, damit Börsenöffnungen rechtzeitig bemerkt werden
+MAX_SLEEP = 60
+
+# Handelszeiten in lokaler Börsenzeit nach Symbol-Suffix (ohne Suffix: US-Börsen).
+# Nach Handelsschluss bleibt der kurze Takt noch CLOSE_GRACE_MINUTES aktiv,
+# damit die endgültige Schlusskerze sicher abgeholt wird.
+SESSIONS = {
+    '.DE': ('Europe/Berlin', (9, 0), (17, 30)),
+    '.F': ('Europe/Berlin', (8, 0), (22, 0)),
+    '': ('America/New_York', (9, 30), (16, 0)),
+}
+CLOSE_GRACE_MINUTES = 30
+
+
+def hot_symbols(default):
+    """Heiße Symbole aus PREWARM_SYMBOLS (kommagetrennt), sonst `default`."""
+    configured = os.environ.get('PREWARM_SYMBOLS')
+    if configured is None:
+        return sorted(set(default))
+    return sorted({s.strip().upper() for s in configured.split(',') if s.strip()})
+
+
+def session_open(symbol, now=None):
+    """Handelt die Börse des Symbols gerade (inkl. Nachlauf nach Schluss)?"""
+    suffix = symbol[symbol.rfind('.'):] if '.' in symbol else ''
+    session = SESSIONS.get(suffix)
+    if session is None:
+        return is_market_open(now)
+    tz, (open_h, open_m), (close_h, close_m) = session
+    try:
+        local = (now or datetime.now(ZoneInfo(tz))).astimezone(ZoneInfo(tz))
+    except ZoneInfoNotFoundError:
+        return is_market_open(now)
+    minutes = local.hour * 60 + local.minute
+    return (local.weekday() < 5
+            and open_h * 60 + open_m <= minutes < close_h * 60 + close_m + CLOSE_GRACE_MINUTES)
+
+
+class _Entry:
+    __slots__ = ('info', 'daily', 'fetched')
+
+    def __init__(self, info, daily):
+        self.info = info
+        self.daily = daily
+        self.fetched = time.monotonic()
+
+
+class Prewarmer:
+    """Hält info und Tageshistorie eines festen Symbolsatzes warm.
+
+    Ein Hintergrund-Thread ruft jedes heiße Symbol im Takt seiner Börse neu
+    ab (kurz während der Handelszeit, lang außerhalb). Anfragen bekommen
+    den letzten Stand sofort (stale-while-revalidate): ist er älter als der
+    aktuelle Takt, wird im Hintergrund neu geladen, die Anfrage wartet nie.
+    Nur wenn noch gar nichts vorliegt, lädt der Aufrufer selbst und
+    übergibt das Ergebnis mit put().
+
+    `fetch(symbol)` liefert (info, Tageshistorie) oder wirft; fehlgeschlagene
+    Abrufe behalten den alten Stand und werden im nächsten Takt wiederholt.
+    """
+
+    def __init__(self, fetch, symbols, open_interval=DEFAULT_OPEN_INTERVAL,
+                 closed_interval=DEFAULT_CLOSED_INTERVAL, workers=DEFAULT_WORKERS, enabled=True):
+        self.fetch = fetch
+        self.symbols = frozenset(symbols)
+        self.open_interval = open_interval
+        self.closed_interval = closed_interval
+        self.workers = workers
+        self.enabled = enabled and bool(self.symbols)
+        self._entries = {}
+        self._refreshing = set()
+        self._attempted = {}
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pool = None
+        self._counts = {'fresh': 0, 'stale': 0, 'miss': 0, 'refreshed': 0, 'failed': 0}
+
+    def enable(self):
+        """Schaltet das Vorwärmen ein (z.B. im selbst gehosteten Server)."""
+        self.enabled = bool(self.symbols)
+
+    def is_hot(self, symbol):
+        return symbol in self.symbols
+
+    def interval(self, symbol, now=None):
+        return self.open_interval if session_open(symbol, now) else self.closed_interval
+
+    def start(self):
+        """Startet den Hintergrund-Thread (idempotent, erst bei der ersten Anfrage)."""
+        if not self.enabled or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='prewarm')
+            self._thread = threading.Thread(target=self._run, name='prewarm', daemon=True)
+            self._thread.start()
+        logger.info(f"Vorwärmen gestartet für {len(self.symbols)} Symbole")
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def get(self, symbol):
+        """(info, Tageshistorie) eines heißen Symbols, ggf. veraltet; None ohne Stand.
+
+        Abgeschaltet immer None: ohne Hintergrund-Thread würde ein Stand nie erneuert.
+        """
+        if not self.enabled or symbol not in self.symbols:
+            return None
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                self._counts['miss'] += 1
+                return None
+            stale = time.monotonic() - entry.fetched >= self.interval(symbol)
+            self._counts['stale' if stale else 'fresh'] += 1
+        if stale:
+            self._revalidate(symbol)
+        return entry.info, entry.daily
+
+    def put(self, symbol, info, daily):
+        """Übernimmt einen anderweitig geladenen Stand (nur für heiße Symbole, wenn eingeschaltet)."""
+        if not self.enabled or symbol not in self.symbols:
+            return
+        with self._lock:
+            self._entries[symbol] = _Entry(info, daily)
+            self._attempted[symbol] = time.monotonic()
+
+    def clear(self):
+        """Vergisst alle Stände (z.B. für Benchmarks mit kaltem Start)."""
+        with self._lock:
+            self._entries.clear()
+            self._attempted.clear()
+            self._failures.clear()
+
+    def refresh(self, symbol):
+        """Lädt ein Symbol synchron neu; True bei Erfolg."""
+        try:
+            info, daily = self.fetch(symbol)
+        except Exception as e:
+            logger.warning(f"Vorwärmen von {symbol} fehlgeschlagen: {e}")
+            with self._lock:
+                self._counts['failed'] += 1
+                self._failures[symbol] = self._failures.get(symbol, 0) + 1
+            return False
+        self.put(symbol, info, daily)
+        with self._lock:
+            self._counts['refreshed'] += 1
+            self._failures.pop(symbol, None)
+        return True
+
+    def warm(self):
+        """Lädt alle heißen Symbole synchron (z.B. für Benchmarks); Anzahl Erfolge."""
+        return sum(self.refresh(symbol) for symbol in sorted(self.symbols))
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'running': self._thread is not None and self._thread.is_alive(),
+                'requests': dict(self._counts),
+                'symbols': {
+                    symbol: {
+                        'age': round(now - entry.fetched, 1) if entry else None,
+                        'interval': self.interval(symbol),
+                        'failures': self._failures.get(symbol, 0),
+                    }
+                    for symbol in sorted(self.symbols)
+                    for entry in [self._entries.get(symbol)]
+                },
+            }
+
+    def _revalidate(self, symbol):
+        """Plant einen Hintergrundabruf ein, sofern keiner läuft."""
+        with self._lock:
+            if symbol in self._refreshing or self._pool is None:
+                return
+            self._refreshing.add(symbol)
+            self._attempted[symbol] = time.monotonic()
+        try:
+            self._pool.submit(self._refresh_task, symbol)
+        except RuntimeError:
+            # Pool bereits heruntergefahren
+            with self._lock:
+                self._refreshing.discard(symbol)
+
+    def _refresh_task(self, symbol):
+        try:
+            self.refresh(symbol)
+        finally:
+            with self._lock:
+                self._refreshing.discard(symbol)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            next_due = now + MAX_SLEEP
+            for symbol in self.symbols:
+                with self._lock:
+                    attempted = self._attempted.get(symbol)
+                interval = self.interval(symbol)
+                due = now if attempted is None else attempted + interval
+                if due <= now:
+                    self._revalidate(symbol)
+                    due = now + interval
+                next_due = min(next_due, due)
+            self._wake.wait(max(1.0, next_due - now))
+            self._wake.clear()
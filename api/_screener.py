@@ -0,0 +1,141 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+
+from _analytics import yearly_metrics, geopak10
+from _lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# Sortierbare Kennzahlen und ihre natürliche Reihenfolge (besser zuerst)
+SORT_KEYS = {
+    'geoPak10': 'desc',
+    'dividendYield': 'desc',
+    'volatility': 'asc',
+    'maxDrawdown': 'desc',
+    'drawdown': 'desc',
+}
+# Fenster für Volatilität, maximalen Drawdown und Dividendenrendite (Handelstage bzw. Tage)
+RISK_WINDOW = 252
+TRAILING_DAYS = 365
+TRADING_DAYS = 252
+
+# Prozesse für die Kennzahlen; mit nur einer CPU oder unter MIN_PARALLEL
+# offenen Symbolen wird im Aufrufer gerechnet, weil Pickling und
+# Prozesswechsel dann mehr kosten als die Rechnung (~2,5 ms pro Symbol)
+CPUS = os.cpu_count() or 1
+DEFAULT_PROCESSES = int(os.environ.get('SCREENER_PROCESSES', CPUS))
+MIN_PARALLEL = 64
+
+_pool = None
+_pool_failed = False
+
+
+def parse_sort(query_params):
+    """Liest `sort=` und `order=asc|desc`; wirft ValueError mit Meldung für den Client."""
+    sort = query_params.get('sort', ['geoPak10'])[0] or 'geoPak10'
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Ungültige Sortierung: '{sort}' (erlaubt: {', '.join(SORT_KEYS)})")
+    order = (query_params.get('order', [SORT_KEYS[sort]])[0] or SORT_KEYS[sort]).lower()
+    if order not in ('asc', 'desc'):
+        raise ValueError(f"Ungültige Reihenfolge: '{order}' (erlaubt: asc, desc)")
+    return sort, order
+
+
+def screen_row(symbol, daily, today=None):
+    """Screener-Kennzahlen eines Symbols aus Schlusskursen und Dividenden (Prozent).
+
+    Läuft im Prozesspool, daher nur picklebare Argumente und Rückgaben;
+    None, wenn keine Kurse vorliegen.
+    """
+    today = today or date.today()
+    closes = daily['Close'].to_numpy(dtype='float64')
+    valid = ~np.isnan(closes) & (closes > 0)
+    if not valid.any():
+        return None
+    closes = closes[valid]
+    index = daily.index[valid]
+    price = float(closes[-1])
+
+    gp = geopak10(yearly_metrics(daily, today), price, today)
+
+    # Dividendenrendite der letzten zwölf Monate auf den letzten Schlusskurs
+    dividend_yield = None
+    if 'Dividends' in daily.columns:
+        naive = index.tz_localize(None) if index.tz is not None else index
+        recent = naive >= pd.Timestamp(today - timedelta(days=TRAILING_DAYS))
+        paid = float(np.nansum(daily['Dividends'].to_numpy(dtype='float64')[valid][recent]))
+        dividend_yield = round(paid / price * 100, 2)
+
+    # Risiko über das letzte Handelsjahr
+    window = closes[-(RISK_WINDOW + 1):]
+    volatility = max_drawdown = None
+    if len(window) > 2:
+        returns = np.diff(np.log(window))
+        volatility = round(float(returns.std(ddof=1) * np.sqrt(TRADING_DAYS) * 100), 2)
+        max_drawdown = round(float((window / np.maximum.accumulate(window) - 1.0).min() * 100), 2)
+    drawdown = round((price / float(window.max()) - 1.0) * 100, 2)
+
+    return {
+        'symbol': symbol,
+        'price': round(price, 2),
+        'lastDate': index[-1].date().isoformat(),
+        'geoPak10': gp['total'] if gp else None,
+        'geoPak10Price': gp['price'] if gp else None,
+        'dividendYield': dividend_yield,
+        'volatility': volatility,
+        'maxDrawdown': max_drawdown,
+        'drawdown': drawdown,
+    }
+
+
+def _process_pool(processes):
+    """Gemeinsamer Prozesspool der warmen Instanz, None wo es keine Prozesse gibt.
+
+    Mit 'spawn', weil der Server bereits Threads hat (fork kann dabei
+    gehaltene Locks kopieren). In Umgebungen ohne Semaphoren (z.B. AWS
+    Lambda ohne /dev/shm) schlägt der Start fehl; dann wird im Aufrufer
+    gerechnet.
+    """
+    global _pool, _pool_failed
+    if _pool is None and not _pool_failed and processes > 1:
+        try:
+            import multiprocessing
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+        except (OSError, NotImplementedError, ImportError) as e:
+            logger.warning(f"Prozesspool nicht verfügbar, rechne im Prozess: {e}")
+            _pool_failed = True
+    return _pool
+
+
+def compute_rows(items, today=None, processes=None):
+    """screen_row() für [(symbol, daily)], bei genug Symbolen verteilt auf Prozesse."""
+    global _pool, _pool_failed
+    today = today or date.today()
+    processes = processes or DEFAULT_PROCESSES
+    parallel = CPUS > 1 and len(items) >= MIN_PARALLEL
+    pool = _process_pool(processes) if parallel else None
+    if pool is not None:
+        # Nur die benötigten Spalten pickeln; Blöcke, damit jeder Prozess mehrere Symbole rechnet
+        symbols = [symbol for symbol, _ in items]
+        frames = [daily[[c for c in ('Close', 'Dividends') if c in daily.columns]] for _, daily in items]
+        chunksize = max(1, len(items) // (processes * 4))
+        try:
+            return list(pool.map(screen_row, symbols, frames, [today] * len(items), chunksize=chunksize))
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Prozesspool ausgefallen, rechne im Prozess: {e}")
+            _pool, _pool_failed = None, True
+    return [screen_row(symbol, daily, today) for symbol, daily in items]
+
+
+def rank(rows, sort, order):
+    """Sortiert nach `sort`; Zeilen ohne Wert stehen unabhängig von `order` am Ende."""
+    present = [row for row in rows if row.get(sort) is not None]
+    missing = [row for row in rows if row.get(sort) is None]
+    present.sort(key=lambda row: row[sort], reverse=(order == 'desc'))
+    return [dict(row, rank=i) for i, row in enumerate(present + missing, 1)]
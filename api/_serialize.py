@@ -0,0 +1,170 @@
+import json
+import struct
+
+from _lazy import lazy_import
+
+np = lazy_import('numpy')
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# Antwortformate für den Parameter `format=`
+FORMATS = ('json', 'columns', 'binary', 'ndjson')
+PRICE_SCALE = 100
+BINARY_MAGIC = b'SAB1'
+# Kerzen pro geschriebenem Block beim Streaming
+NDJSON_CHUNK_ROWS = 2000
+
+
+def round2(values):
+    """Rundet ein float64-Array wie Pythons round(x, 2).
+
+    np.round rechnet über x * 100 und kann bei Werten knapp an der
+    Rundungsgrenze um eine Stelle abweichen. Diese wenigen Kandidaten
+    werden mit round() nachgerechnet, damit das JSON bytegleich bleibt.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100.0
+    frac = np.abs(scaled - np.floor(scaled) - 0.5)
+    suspects = np.flatnonzero(frac < 1e-6)
+    for i in suspects:
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+def price_columns(hist, intraday=False):
+    """Zieht die gültigen OHLCV-Spalten als NumPy-Arrays aus einem history()-Frame.
+
+    `time` ist die lokale Börsenzeit als Tage (bzw. Minuten bei Intraday)
+    seit 1970-01-01, Preise sind bereits auf zwei Stellen gerundet.
+    """
+    unit = 'm' if intraday else 'D'
+    if hist.empty:
+        frame = hist
+    else:
+        valid = hist[PRICE_COLUMNS].notna().all(axis=1).to_numpy()
+        frame = hist[valid]
+
+    if frame.empty:
+        empty = np.empty(0, dtype='float64')
+        return {
+            'unit': unit, 'time': np.empty(0, dtype='int64'),
+            'open': empty, 'high': empty, 'low': empty, 'close': empty,
+            'volume': np.empty(0, dtype='int64'),
+        }
+
+    # Lokales Handelsdatum ohne Zeitzone; deutlich schneller als strftime()
+    index = frame.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return {
+        'unit': unit,
+        'time': index.to_numpy().astype(f'datetime64[{unit}]').astype('int64'),
+        'open': round2(frame['Open'].to_numpy(dtype='float64')),
+        'high': round2(frame['High'].to_numpy(dtype='float64')),
+        'low': round2(frame['Low'].to_numpy(dtype='float64')),
+        'close': round2(frame['Close'].to_numpy(dtype='float64')),
+        'volume': frame['Volume'].fillna(0).to_numpy(dtype='float64').astype('int64'),
+    }
+
+
+def format_times(columns, values=None):
+    """ISO-Strings (JJJJ-MM-TT bzw. mit Uhrzeit) für Zeitwerte aus price_columns()."""
+    unit = columns['unit']
+    values = columns['time'] if values is None else np.asarray(values)
+    return np.datetime_as_string(values.astype(f'datetime64[{unit}]'), unit=unit).tolist()
+
+
+def serialize_prices(hist, intraday=False):
+    """Wandelt einen history()-Frame spaltenweise in die `prices`-Liste um.
+
+    Bei Intraday-Intervallen enthält `date` zusätzlich die Uhrzeit (Börsenzeit).
+    """
+    return rows_from_columns(price_columns(hist, intraday))
+
+
+def rows_from_columns(columns):
+    """Klassisches JSON-Format: eine Liste von Objekten pro Kerze."""
+    if len(columns['time']) == 0:
+        return []
+    return [
+        {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for d, o, h, l, c, v in zip(
+            format_times(columns),
+            columns['open'].tolist(), columns['high'].tolist(),
+            columns['low'].tolist(), columns['close'].tolist(),
+            columns['volume'].tolist()
+        )
+    ]
+
+
+def encode_columns(columns):
+    """Spaltenformat: parallele Arrays, Zeit als Delta, Preise als Ganzzahlen in Cent.
+
+    Der Client rekonstruiert Zeit = timeBase + kumulierte Summe von timeDeltas
+    und Preis = Wert / priceScale.
+    """
+    time = columns['time']
+    deltas = np.diff(time, prepend=time[:1]) if len(time) else time
+    return {
+        'encoding': 'columns-v1',
+        'count': int(len(time)),
+        'timeUnit': columns['unit'],
+        'timeBase': int(time[0]) if len(time) else None,
+        'timeDeltas': deltas.tolist(),
+        'priceScale': PRICE_SCALE,
+        'open': _scaled(columns['open']),
+        'high': _scaled(columns['high']),
+        'low': _scaled(columns['low']),
+        'close': _scaled(columns['close']),
+        'volume': columns['volume'].tolist(),
+    }
+
+
+def _scaled(values):
+    return np.rint(values * PRICE_SCALE).astype('int64').tolist()
+
+
+def encode_binary(meta, columns):
+    """Binärformat: JSON-Metadaten plus little-endian Arrays ohne Kopie im Browser lesbar.
+
+    Aufbau (alle Offsets 8-Byte-ausgerichtet, damit `new Float64Array(buffer,
+    offset, count)` direkt funktioniert):
+
+        4 Bytes  Magic b'SAB1'
+        4 Bytes  uint32 Länge L der Metadaten
+        L Bytes  Metadaten-JSON (UTF-8, mit Leerzeichen auf 8 Byte aufgefüllt)
+        int32[n] Zeit (Tage bzw. Minuten seit 1970), auf 8 Byte aufgefüllt
+        float64[n] open, high, low, close, volume
+
+    `n` steht als `count` in den Metadaten.
+    """
+    count = len(columns['time'])
+    meta = dict(meta, count=count, timeUnit=columns['unit'])
+    header = json.dumps(meta).encode('utf-8')
+    header += b' ' * (-(8 + len(header)) % 8)
+
+    time = columns['time'].astype('<i4').tobytes()
+    time += b'\0' * (-len(time) % 8)
+    parts = [BINARY_MAGIC, struct.pack('<I', len(header)), header, time]
+    for name in ('open', 'high', 'low', 'close'):
+        parts.append(columns[name].astype('<f8').tobytes())
+    parts.append(columns['volume'].astype('<f8').tobytes())
+    return b''.join(parts)
+
+
+def iter_ndjson(meta, columns, chunk_rows=NDJSON_CHUNK_ROWS):
+    """Streaming-Format: erste Zeile Metadaten, danach eine JSON-Zeile pro Kerze.
+
+    Liefert Bytes-Blöcke zu je `chunk_rows` Kerzen, die direkt geschrieben
+    werden können; es entsteht weder die Liste aller Zeilen noch der
+    komplette JSON-String im Speicher.
+    """
+    count = len(columns['time'])
+    yield json.dumps(dict(meta, count=count)).encode('utf-8') + b'\n'
+    for start in range(0, count, chunk_rows):
+        part = {key: (value[start:start + chunk_rows] if isinstance(value, np.ndarray) else value)
+                for key, value in columns.items()}
+        # Ein dumps() pro Block statt pro Zeile; die Zeilen enthalten nur
+        # Datum und Zahlen, '}, {' trennt also eindeutig die Objekte
+        rows = json.dumps(rows_from_columns(part))[1:-1]
+        yield (rows.replace('}, {', '}\n{') + '\n').encode('utf-8')
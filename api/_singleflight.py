@@ -0,0 +1,67 @@
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Bündelt gleichzeitige identische Aufrufe zu einem einzigen.
+
+    Der erste Aufrufer für einen Schlüssel führt die Funktion aus, alle
+    weiteren warten auf dessen Ergebnis (oder Exception) und teilen es.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """Führt func aus oder wartet auf den bereits laufenden Aufruf für `key`.
+
+        Gibt (Ergebnis, geteilt ja/nein) zurück.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self):
+        """Zähler für ausgeführte und zusammengelegte Aufrufe."""
+        with self._lock:
+            return {
+                'executed': self._executed,
+                'coalesced': self._coalesced,
+                'inFlight': len(self._calls),
+            }
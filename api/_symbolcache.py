@@ -0,0 +1,140 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Konfiguration über Umgebungsvariablen (auf Vercel ist nur /tmp beschreibbar)
+DEFAULT_PATH = os.environ.get(
+    'SYMBOL_CACHE_PATH',
+    os.path.join(tempfile.gettempdir(), 'stockanalyzer_symbols.sqlite')
+)
+DEFAULT_TTL = int(os.environ.get('SYMBOL_CACHE_TTL', 7 * 24 * 3600))
+DEFAULT_NEGATIVE_TTL = int(os.environ.get('SYMBOL_CACHE_NEGATIVE_TTL', 3600))
+DEFAULT_MAX_ENTRIES = int(os.environ.get('SYMBOL_CACHE_MAX_ENTRIES', 5000))
+
+# Markiert Einträge "kein Symbol gefunden" in SQLite
+_NEGATIVE = ''
+_MISS = object()
+
+
+def normalize_key(user_input):
+    """Normalisiert eine Eingabe zum Cache-Schlüssel."""
+    return ' '.join(user_input.strip().upper().split())
+
+
+class SymbolCache:
+    """Cache Eingabe -> aufgelöstes Symbol mit eigener TTL für Treffer und Fehlschläge.
+
+    Vorne liegt ein In-Memory-LRU für Lookups im Mikrosekundenbereich,
+    dahinter eine SQLite-Datei, damit Einträge Warm-Restarts überleben.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = self._open(path)
+
+    def _open(self, path):
+        """Öffnet die SQLite-Datei, fällt bei Fehlern auf reinen Memory-Betrieb zurück."""
+        if not path:
+            return None
+        try:
+            db = sqlite3.connect(path, timeout=1.0, check_same_thread=False, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS symbols ('
+                ' key TEXT PRIMARY KEY,'
+                ' symbol TEXT NOT NULL,'
+                ' expires REAL NOT NULL,'
+                ' accessed REAL NOT NULL)'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS symbols_accessed ON symbols (accessed)')
+            return db
+        except sqlite3.Error as e:
+            logger.warning(f"Symbol-Cache '{path}' nicht verfügbar, nutze nur Memory: {e}")
+            return None
+
+    def get(self, user_input, default=_MISS):
+        """Liefert das gecachte Symbol (None = bekannter Fehlschlag) oder `default`."""
+        key = normalize_key(user_input)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                symbol, expires = entry
+                if expires > now:
+                    self._memory.move_to_end(key)
+                    return symbol
+                del self._memory[key]
+
+            if self._db is None:
+                return default
+            try:
+                row = self._db.execute(
+                    'SELECT symbol, expires FROM symbols WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return default
+                if row[1] <= now:
+                    self._db.execute('DELETE FROM symbols WHERE key = ?', (key,))
+                    return default
+                self._db.execute('UPDATE symbols SET accessed = ? WHERE key = ?', (now, key))
+            except sqlite3.Error as e:
+                logger.warning(f"Symbol-Cache Lesefehler: {e}")
+                return default
+
+            symbol = row[0] or None
+            self._remember(key, symbol, row[1])
+            return symbol
+
+    def set(self, user_input, symbol):
+        """Speichert ein aufgelöstes Symbol; `None` speichert einen Fehlschlag."""
+        key = normalize_key(user_input)
+        now = time.time()
+        expires = now + (self.ttl if symbol else self.negative_ttl)
+        with self._lock:
+            self._remember(key, symbol, expires)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO symbols (key, symbol, expires, accessed) VALUES (?, ?, ?, ?)',
+                    (key, symbol or _NEGATIVE, expires, now)
+                )
+                self._evict_db()
+            except sqlite3.Error as e:
+                logger.warning(f"Symbol-Cache Schreibfehler: {e}")
+
+    def clear(self):
+        """Leert Memory und SQLite."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM symbols')
+
+    def _remember(self, key, symbol, expires):
+        self._memory[key] = (symbol, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_db(self):
+        """Entfernt abgelaufene und die am längsten nicht genutzten Einträge."""
+        self._db.execute('DELETE FROM symbols WHERE expires <= ?', (time.time(),))
+        count = self._db.execute('SELECT COUNT(*) FROM symbols').fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute(
+                'DELETE FROM symbols WHERE key IN ('
+                ' SELECT key FROM symbols ORDER BY accessed ASC LIMIT ?)',
+                (count - self.max_entries,)
+            )
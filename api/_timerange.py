@@ -0,0 +1,140 @@
+import re
+from datetime import date, datetime, timedelta
+
+from _lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+DEFAULT_PERIOD = 'max'
+DEFAULT_INTERVAL = '1d'
+
+# Von yfinance direkt unterstützte Werte
+YF_PERIODS = {'1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max'}
+INTERVALS = {'1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo'}
+INTRADAY_INTERVALS = {'1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h'}
+
+_PERIOD_RE = re.compile(r'^(\d{1,3})(d|wk|mo|y)$')
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"Ungültiges Datum für '{name}': '{value}' (erwartet JJJJ-MM-TT)")
+
+
+def _period_start(period, today):
+    """Rechnet Perioden wie 3y oder 20y, die yfinance nicht kennt, in ein Startdatum um."""
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"Ungültige Periode: '{period}'")
+    amount, unit = int(match.group(1)), match.group(2)
+    if unit == 'd':
+        return today - timedelta(days=amount)
+    if unit == 'wk':
+        return today - timedelta(weeks=amount)
+    months = amount * 12 if unit == 'y' else amount
+    year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+    month += 1
+    # 29. Februar o.ä. auf den Monatsletzten begrenzen
+    for day in (today.day, 30, 29, 28):
+        try:
+            return date(year, month, day)
+        except ValueError:
+            continue
+
+
+def parse_range(query_params, today=None):
+    """Liest period/start/end/interval aus den Query-Parametern.
+
+    Wirft ValueError mit einer Meldung für den Client bei ungültigen Werten.
+    """
+    today = today or date.today()
+    period = (query_params.get('period', [None])[0] or '').strip().lower() or None
+    start = query_params.get('start', [None])[0]
+    end = query_params.get('end', [None])[0]
+    interval = (query_params.get('interval', [None])[0] or DEFAULT_INTERVAL).strip().lower()
+
+    if interval not in INTERVALS:
+        raise ValueError(f"Ungültiges Intervall: '{interval}'")
+
+    start = _parse_date(start, 'start') if start else None
+    end = _parse_date(end, 'end') if end else None
+    if start and period:
+        raise ValueError("'period' und 'start' können nicht kombiniert werden")
+    if start and end and start > end:
+        raise ValueError("'start' liegt nach 'end'")
+
+    if not start and not end:
+        period = period or DEFAULT_PERIOD
+        if period not in YF_PERIODS:
+            start = _period_start(period, today)
+    elif period == 'ytd':
+        start = date(end.year, 1, 1)
+    elif period and period != 'max':
+        # Periode relativ zum angegebenen Enddatum
+        start = _period_start(period, end)
+
+    return {
+        'period': period,
+        'start': start,
+        'end': end,
+        'interval': interval,
+    }
+
+
+def history_kwargs(rng):
+    """Baut die Argumente für ticker.history() aus einem geparsten Bereich."""
+    kwargs = {'interval': rng['interval']}
+    if rng['start'] or rng['end']:
+        if rng['start']:
+            kwargs['start'] = rng['start'].isoformat()
+        if rng['end']:
+            # yfinance behandelt 'end' exklusiv, die API inklusiv
+            kwargs['end'] = (rng['end'] + timedelta(days=1)).isoformat()
+    else:
+        kwargs['period'] = rng['period']
+    return kwargs
+
+
+def range_bounds(rng, today=None):
+    """Erster und letzter Tag (jeweils inklusiv, None = offen) eines geparsten Bereichs."""
+    today = today or date.today()
+    start, end = rng['start'], rng['end']
+    if start is None and end is None and rng['period'] not in (None, 'max'):
+        start = date(today.year, 1, 1) if rng['period'] == 'ytd' else _period_start(rng['period'], today)
+    return start, end
+
+
+def slice_history(hist, rng, today=None):
+    """Schneidet den angeforderten Bereich aus einer vollständigen Tageshistorie."""
+    if hist.empty:
+        return hist
+    start, end = range_bounds(rng, today)
+
+    days = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+    days = days.normalize()
+    mask = None
+    if start is not None:
+        mask = days >= pd.Timestamp(start)
+    if end is not None:
+        upper = days <= pd.Timestamp(end)
+        mask = upper if mask is None else mask & upper
+    return hist if mask is None else hist[mask]
+
+
+def is_intraday(rng):
+    return rng['interval'] in INTRADAY_INTERVALS
+
+
+def describe_range(rng, first_date, last_date, count):
+    """Beschreibt den tatsächlich gelieferten Bereich für die Response."""
+    return {
+        'period': rng['period'],
+        'start': rng['start'].isoformat() if rng['start'] else None,
+        'end': rng['end'].isoformat() if rng['end'] else None,
+        'interval': rng['interval'],
+        'firstDate': first_date,
+        'lastDate': last_date,
+        'count': count,
+    }
@@ -0,0 +1,167 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Anzahl der letzten Messwerte pro Stufe für die Perzentile
+DEFAULT_WINDOW = int(os.environ.get('TIMING_WINDOW', 1000))
+
+_current = contextvars.ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Dauer der Stufen einer Anfrage (Millisekunden, in Aufrufreihenfolge).
+
+    Stufen können aus Pool-Threads gemeldet werden (siehe submit()),
+    deshalb ist record() gesperrt.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.stages.append((name, seconds * 1000))
+
+    def total(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def summary(self):
+        """Summe pro Stufe (parallele Probes derselben Art werden addiert)."""
+        totals = {}
+        with self._lock:
+            for name, ms in self.stages:
+                totals[name] = totals.get(name, 0.0) + ms
+        return totals
+
+    def header(self):
+        """Wert für den Server-Timing-Header, z.B. 'resolve;dur=1.2, total;dur=40.0'."""
+        with self._lock:
+            parts = [f'{name};dur={ms:.1f}' for name, ms in self.stages]
+        parts.append(f'total;dur={self.total():.1f}')
+        return ', '.join(parts)
+
+
+class TimingStats:
+    """Aggregiert Stufendauern über die Anfragen einer warmen Instanz.
+
+    Pro Stufe werden Anzahl und Summe sowie die letzten `window` Werte
+    gehalten, aus denen p50/p95/p99 berechnet werden.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.started = time.time()
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, summary):
+        with self._lock:
+            for name, ms in summary.items():
+                stage = self._stages.get(name)
+                if stage is None:
+                    stage = self._stages[name] = {'count': 0, 'sum': 0.0, 'recent': deque(maxlen=self.window)}
+                stage['count'] += 1
+                stage['sum'] += ms
+                stage['recent'].append(ms)
+
+    def snapshot(self):
+        with self._lock:
+            stages = {name: (s['count'], s['sum'], sorted(s['recent'])) for name, s in self._stages.items()}
+        return {
+            'since': self.started,
+            'stages': {
+                name: {
+                    'count': count,
+                    'mean': round(total / count, 2),
+                    'p50': _percentile(recent, 50),
+                    'p95': _percentile(recent, 95),
+                    'p99': _percentile(recent, 99),
+                    'max': round(recent[-1], 2),
+                }
+                for name, (count, total, recent) in stages.items()
+            },
+        }
+
+
+def _percentile(ordered, p):
+    """Perzentil nach Nearest-Rank aus einer sortierten Liste."""
+    index = max(0, -(-len(ordered) * p // 100) - 1)
+    return round(ordered[index], 2)
+
+
+STATS = TimingStats()
+
+
+def begin_request():
+    """Startet die Zeitmessung für die aktuelle Anfrage."""
+    timing = RequestTiming()
+    _current.set(timing)
+    return timing
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def stage(name):
+    """Misst einen Abschnitt der laufenden Anfrage (ohne aktive Messung: nichts)."""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.record(name, time.perf_counter() - start)
+
+
+def submit(pool, name, func, *args, **kwargs):
+    """pool.submit() mit dem Kontext der Anfrage; misst `func` als Stufe `name`.
+
+    Mit `name=None` wird nur der Kontext übernommen, damit Stufen innerhalb
+    von `func` der Anfrage zugeordnet werden.
+    """
+    context = contextvars.copy_context()
+
+    def run():
+        if name is None:
+            return func(*args, **kwargs)
+        with stage(name):
+            return func(*args, **kwargs)
+
+    return pool.submit(context.run, run)
+
+
+def server_timing():
+    """Header-Dict mit Server-Timing der laufenden Anfrage (leer ohne Messung)."""
+    timing = _current.get()
+    return {'Server-Timing': timing.header()} if timing is not None else {}
+
+
+def finish_request(timing, aggregate=True, **fields):
+    """Schreibt eine JSON-Logzeile und übernimmt die Messung in die Statistik.
+
+    Mit `aggregate=False` (Fehler, Metrik-Abrufe) wird nur geloggt, damit
+    die Perzentile nur echte Antworten widerspiegeln.
+    """
+    summary = timing.summary()
+    summary['total'] = timing.total()
+    if aggregate:
+        STATS.add(summary)
+    logger.info(json.dumps({
+        'event': 'timing',
+        **fields,
+        'stages': {name: round(ms, 1) for name, ms in summary.items()},
+    }))
+    _current.set(None)
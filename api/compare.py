@@ -0,0 +1,195 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+import logging
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from getstockdata import (
+    BAR_STORE, INSTRUMENT_INDEX, PREWARMER, cached_info, new_ticker, resolve_input, upstream_kwargs
+)
+from _compare import (
+    TRADING_DAYS, parse_window, parse_currency, normalize_currency, fx_symbol, daily_closes, align,
+    within, rates_on, common_start, rebased, log_returns, covariance, correlation, rolling_correlation,
+    thin, format_days, to_list
+)
+from _downsample import parse_points
+from _history import parse_symbols, load_histories
+from _http import CORS_HEADERS, send_json
+from _lazy import lazy_import
+from _timerange import parse_range, range_bounds
+from _timing import begin_request, finish_request, server_timing, stage
+
+np = lazy_import('numpy')
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Obergrenze pro Anfrage und Anzahl paralleler Yahoo-Abrufe
+MAX_SYMBOLS = int(os.environ.get('COMPARE_MAX_SYMBOLS', 100))
+MAX_WORKERS = int(os.environ.get('COMPARE_MAX_WORKERS', 16))
+
+def currency_of(symbol):
+    """Handelswährung aus ticker.info (Vorwärm-Speicher bzw. MEMORY), None wenn unbekannt."""
+    hot = PREWARMER.get(symbol)
+    try:
+        info = hot[0] if hot is not None else cached_info(symbol, new_ticker(symbol))
+    except Exception as e:
+        logger.warning(f"Währung für {symbol} nicht ermittelbar: {e}")
+        return None
+    return (info or {}).get('currency')
+
+def compare(inputs, price_range, currency=None, window=60, points=None):
+    """Vergleich mehrerer Symbole auf gemeinsamem Kalender in einer Währung.
+
+    Liefert Wertentwicklung (100 = erster gemeinsamer Tag), rollierende
+    Korrelation zum ersten Symbol sowie Korrelations- und (annualisierte)
+    Kovarianzmatrix der täglichen Log-Renditen; fehlgeschlagene Eingaben
+    landen in `failed`.
+    """
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        with stage('resolve'):
+            symbols = list(pool.map(resolve_input, inputs))
+        unique = list(dict.fromkeys(symbols))
+        with stage('fetch'):
+            currencies = {symbol: pool.submit(currency_of, symbol) for symbol in unique}
+            frames = load_histories(pool, BAR_STORE, unique, PREWARMER, **upstream_kwargs())
+            currencies = {symbol: normalize_currency(future.result()) for symbol, future in currencies.items()}
+
+        start, end = range_bounds(price_range)
+        series = {}
+        for symbol in unique:
+            daily = frames.get(symbol)
+            if daily is not None and not daily.empty:
+                days, closes = within(*daily_closes(daily), start, end)
+                if len(days):
+                    series[symbol] = (days, closes * currencies[symbol][1])
+
+        # Zielwährung: Parameter bzw. Währung des ersten Symbols mit Kursen
+        target = currency or next((currencies[s][0] for s in series if currencies[s][0]), None)
+        pairs = {currencies[s][0] for s in series if currencies[s][0] not in (None, target)}
+        with stage('fx'):
+            fx_symbols = [fx_symbol(source, target) for source in pairs]
+            rates = load_histories(pool, BAR_STORE, fx_symbols, PREWARMER, **upstream_kwargs()) if pairs else {}
+
+    failed = {}
+    for symbol in list(series):
+        source = currencies[symbol][0]
+        if source in (None, target):
+            continue
+        fx = rates.get(fx_symbol(source, target))
+        if fx is None or fx.empty:
+            failed[symbol] = f"Kein Wechselkurs {source}/{target} für '{symbol}' verfügbar."
+            del series[symbol]
+            continue
+        fx_days, fx_rates = daily_closes(fx)
+        days, closes = series[symbol]
+        series[symbol] = (days, closes * rates_on(days, fx_days, fx_rates))
+
+    names = {item['symbol']: item['name'] for item in INSTRUMENT_INDEX.instruments}
+    rows = []
+    for user_input, symbol in zip(inputs, symbols):
+        if symbol in series:
+            continue
+        rows.append({"symbol": symbol, "originalInput": user_input,
+                     "error": failed.get(symbol, f"Keine Kursdaten für '{user_input}' gefunden.")})
+    if not series:
+        return {"currency": target, "symbols": [], "failed": rows}
+
+    with stage('compute'):
+        order = list(series)
+        calendar, prices, traded = align([series[symbol] for symbol in order])
+        start = common_start(traded)
+        calendar, prices, traded = calendar[start:], prices[start:], traded[start:]
+        performance = rebased(prices)
+        return_rows, returns = log_returns(prices, traded)
+        cov = covariance(returns)
+        corr = correlation(cov)
+        rolling = rolling_correlation(returns, 0, window)
+        rolling_rows = return_rows[window - 1:] if len(rolling) else return_rows[:0]
+
+    with stage('format'):
+        first = dict(zip(order, (series[symbol][0][0] for symbol in order)))
+        volatility = np.sqrt(np.diag(cov) * TRADING_DAYS) * 100
+        keep = thin(len(calendar), points)
+        keep_rolling = thin(len(rolling_rows), points)
+        return {
+            "currency": target,
+            "start": format_days(calendar[:1])[0],
+            "end": format_days(calendar[-1:])[0],
+            "window": window,
+            "benchmark": order[0],
+            "symbols": [{
+                "symbol": symbol,
+                "name": names.get(symbol),
+                "originalInput": inputs[symbols.index(symbol)],
+                "currency": currencies[symbol][0],
+                "firstDate": format_days(np.array([first[symbol]]))[0],
+                "performance": round(float(performance[-1, i]) - 100, 2),
+                "volatility": None if np.isnan(volatility[i]) else round(float(volatility[i]), 2),
+            } for i, symbol in enumerate(order)],
+            "dates": format_days(calendar[keep]),
+            "performance": dict(zip(order, to_list(performance[keep].T, 2))),
+            "rollingCorrelation": {
+                "dates": format_days(calendar[rolling_rows[keep_rolling]]),
+                "values": dict(zip(order, to_list(rolling[keep_rolling].T, 4))),
+            },
+            "correlation": to_list(corr, 4),
+            "covariance": to_list(cov * TRADING_DAYS, 6),
+            "observations": len(returns),
+            "failed": rows,
+        }
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        """Vergleich mehrerer Aktien: Wertentwicklung, rollierende Korrelation, Korrelationsmatrix."""
+        logger.info("Vercel Function (Vergleich) aufgerufen")
+        timing = begin_request()
+        log_fields = {'status': 'error'}
+
+        try:
+            query_params = parse_qs(urlparse(self.path).query)
+            try:
+                with stage('parse'):
+                    inputs = parse_symbols(query_params)
+                    price_range = parse_range(query_params)
+                    if price_range['interval'] != '1d':
+                        raise ValueError("Der Vergleich unterstützt nur Tageskurse (interval=1d).")
+                    window = parse_window(query_params)
+                    currency = parse_currency(query_params)
+                    points, _ = parse_points(query_params)
+            except ValueError as e:
+                send_json(self, {'error': str(e)}, headers=server_timing())
+                return
+            if not inputs:
+                send_json(self, {
+                    'error': 'Symbols-Parameter fehlt (z.B. symbols=SAP.DE,SIE.DE,MSFT).'
+                }, headers=server_timing())
+                return
+            if len(inputs) > MAX_SYMBOLS:
+                send_json(self, {
+                    'error': f'Zu viele Symbole ({len(inputs)}), maximal {MAX_SYMBOLS} pro Anfrage.'
+                }, headers=server_timing())
+                return
+
+            result = compare(inputs, price_range, currency, window, points)
+            log_fields.update(status='ok', symbols=len(inputs), failed=len(result['failed']))
+            send_json(self, result, cache=bool(result['symbols']), headers=server_timing())
+            logger.info(f"Vergleich erfolgreich: {len(result['symbols'])}/{len(inputs)} Symbole")
+
+        except Exception as e:
+            logger.error(f"Fehler in Vergleich: {e}", exc_info=True)
+            send_json(self, {
+                'error': f'Serverfehler: {str(e)}'
+            }, headers=server_timing())
+        finally:
+            finish_request(timing, aggregate=log_fields['status'] == 'ok', **log_fields)
+
+    def do_OPTIONS(self):
+        """CORS Preflight."""
+        self.send_response(200)
+        for name, value in CORS_HEADERS.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
@@ -0,0 +1,120 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+import logging
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _lazy import lazy_import
+from getstockdata import (
+    BAR_STORE, StockDataError, cached_info, resolve_input, validate_info,
+    build_stock_data, new_ticker, upstream_kwargs
+)
+from _downsample import parse_points
+from _history import parse_symbols, bulk_history, load_daily_histories
+from _http import CORS_HEADERS, send_json
+from _timerange import parse_range, history_kwargs, slice_history
+
+# Schwere Abhängigkeiten erst beim ersten Abruf laden (Kaltstart)
+pd = lazy_import('pandas')
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Obergrenze pro Anfrage und Anzahl paralleler Yahoo-Abrufe
+MAX_SYMBOLS = int(os.environ.get('BATCH_MAX_SYMBOLS', 50))
+MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 8))
+
+def get_batch_data(inputs, price_range, price_format='json', points=None, downsample_method='lttb'):
+    """Löst alle Eingaben parallel auf und lädt deren Daten gebündelt."""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        symbols = list(pool.map(resolve_input, inputs))
+        unique = list(dict.fromkeys(symbols))
+        tickers = {symbol: new_ticker(symbol) for symbol in unique}
+
+        # ticker.info gibt es nicht gebündelt, daher parallel (bzw. aus MEMORY)
+        infos = {symbol: pool.submit(cached_info, symbol, tickers[symbol]) for symbol in unique}
+
+        # Tageshistorie wird immer gebraucht (Dividenden, Preis-Fallback)
+        intraday = None
+        if price_range['interval'] != '1d':
+            intraday = pool.submit(bulk_history, unique, **history_kwargs(price_range), **upstream_kwargs())
+        full = load_daily_histories(pool, BAR_STORE, unique, tickers, **upstream_kwargs())
+        ranged = intraday.result() if intraday is not None else None
+
+        results = []
+        for user_input, symbol in zip(inputs, symbols):
+            try:
+                info = infos[symbol].result()
+                validate_info(user_input, info)
+                daily = full.get(symbol, pd.DataFrame())
+                if ranged is None:
+                    hist = slice_history(daily, price_range)
+                else:
+                    hist = ranged.get(symbol, pd.DataFrame())
+                results.append(build_stock_data(
+                    user_input, symbol, info, daily, hist, price_range, price_format,
+                    points, downsample_method
+                ))
+            except StockDataError as e:
+                results.append({"symbol": symbol, "originalInput": user_input, "error": str(e)})
+            except Exception as e:
+                logger.error(f"Fehler für '{user_input}' ({symbol}): {e}")
+                results.append({"symbol": symbol, "originalInput": user_input, "error": f"Serverfehler: {str(e)}"})
+    return results
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        """Mehrere Symbole, WKNs oder ISINs in einer Anfrage."""
+        logger.info("Vercel Function (Batch) aufgerufen")
+        
+        try:
+            query_params = parse_qs(urlparse(self.path).query)
+            inputs = parse_symbols(query_params)
+            if not inputs:
+                send_json(self, {
+                    'error': 'Symbols-Parameter fehlt. Bitte geben Sie kommagetrennte Symbole, WKNs oder ISINs an.'
+                })
+                return
+            if len(inputs) > MAX_SYMBOLS:
+                send_json(self, {
+                    'error': f'Zu viele Symbole ({len(inputs)}), maximal {MAX_SYMBOLS} pro Anfrage.'
+                })
+                return
+            
+            try:
+                price_range = parse_range(query_params)
+                points, downsample_method = parse_points(query_params)
+            except ValueError as e:
+                send_json(self, {'error': str(e)})
+                return
+            
+            # Binärformat gibt es nur für Einzelabrufe
+            price_format = (query_params.get('format', ['json'])[0] or 'json').lower()
+            if price_format not in ('json', 'columns'):
+                send_json(self, {'error': f"Ungültiges Format: '{price_format}' (erlaubt: json, columns)"})
+                return
+            
+            results = get_batch_data(inputs, price_range, price_format, points, downsample_method)
+            failed = sum(1 for r in results if 'error' in r)
+            
+            send_json(self, {
+                "results": results,
+                "count": len(results),
+                "failed": failed
+            }, cache=failed < len(results))
+            logger.info(f"Batch erfolgreich: {len(results) - failed}/{len(results)} Symbole")
+            
+        except Exception as e:
+            logger.error(f"Fehler in Batch-Handler: {e}", exc_info=True)
+            send_json(self, {
+                'error': f'Serverfehler: {str(e)}'
+            })
+    
+    def do_OPTIONS(self):
+        """CORS Preflight."""
+        self.send_response(200)
+        for name, value in CORS_HEADERS.items():
+            self.send_header(name, value)
+        self.end_headers()
@@ -1,11 +1,41 @@
+import hmac
 import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from http.server import BaseHTTPRequestHandler
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import date
 import logging
 import re
 from urllib.parse import urlparse, parse_qs
 
+# Hilfsmodule (api/_*.py) liegen neben dieser Datei
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _analytics import metrics_stamp, yearly_metrics, annual_dividends, dividend_yields, geopak10
+from _downsample import parse_points, downsample
+from _http import (
+    CACHE_MARKET_CLOSED, CACHE_MARKET_OPEN, CORS_HEADERS, compress_variants, is_market_open, make_etag, send_body,
+    send_json, send_server_error, send_stream
+)
+from _indicators import IndicatorEngine, parse_indicators
+from _instruments import InstrumentIndex
+from _lazy import LazyObject, lazy_import
+from _memcache import MemoryCache
+from _prewarm import Prewarmer, hot_symbols
+from _serialize import (
+    FORMATS, price_columns, format_times, rows_from_columns, encode_columns, encode_binary,
+    iter_ndjson
+)
+from _singleflight import SingleFlight
+from _symbolcache import SymbolCache
+from _timing import STATS as TIMING_STATS, begin_request, finish_request, server_timing, stage, submit
+from _timerange import parse_range, history_kwargs, slice_history, is_intraday, describe_range
+
+# yfinance (und damit pandas/numpy) erst beim ersten Yahoo-Abruf laden, damit
+# Kaltstarts mit ungültigen Parametern oder Cache-Treffern das nicht bezahlen
+yf = lazy_import('yfinance')
+
 # Konfiguriere Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,24 +65,139 @@ KNOWN_MAPPINGS = {
     'US5949181045': 'MSFT'
 }
 
+# Persistenter Cache Eingabe -> Symbol (überlebt Warm-Restarts), erst bei Bedarf geöffnet
+SYMBOL_CACHE = LazyObject(SymbolCache)
+
+# Lokaler Index über WKN, ISIN, Symbol und Firmenname, erst bei Bedarf geladen
+INSTRUMENT_INDEX = LazyObject(InstrumentIndex.load)
+
+# Pool für parallele Yahoo-Abrufe (Probes, info und Historie), Deadline der Auflösung in Sekunden
+UPSTREAM_POOL = ThreadPoolExecutor(max_workers=int(os.environ.get('UPSTREAM_MAX_WORKERS', 16)))
+RESOLVE_DEADLINE = float(os.environ.get('RESOLVE_DEADLINE', 8))
+
+# Arbeitsspeicher-Cache der warmen Instanz mit Byte-Budget (MEMORY_CACHE_MB):
+# kompakte Tageskerzen, ticker.info und fertig kodierte Antworten
+MEMORY = MemoryCache()
+
+def memory_ttl():
+    """Gültigkeit von info und Antworten im Speicher, wie max-age für Clients."""
+    return (CACHE_MARKET_OPEN if is_market_open() else CACHE_MARKET_CLOSED)[0]
+
+def _bar_store():
+    # _barstore legt beim Import NumPy-Datentypen an
+    from _barstore import BarStore
+    return BarStore(memory=MEMORY)
+
+# Lokaler Tageskerzen-Speicher mit Delta-Abruf
+BAR_STORE = LazyObject(_bar_store)
+
+# Gleichzeitige Abrufe pro Symbol und Bereich zusammenlegen
+FETCH_FLIGHT = SingleFlight()
+
+# Technische Indikatoren mit Zwischenständen pro Symbol (inkrementell bei neuen Kerzen)
+INDICATOR_ENGINE = IndicatorEngine()
+
+def prewarm_fetch(symbol):
+    """Hintergrundabruf eines heißen Symbols: info, Delta der Tageskerzen, Kennzahlen."""
+    ticker = new_ticker(symbol)
+    info = ticker.info
+    if not info or len(info) < 3:
+        raise StockDataError(f"Keine Daten für '{symbol}'")
+    daily = BAR_STORE.history(symbol, ticker, max_age=0)
+    if not daily.empty:
+        analytics_for(symbol, daily)
+    return info, daily
+
+# Häufig angefragte Symbole (Standard: Ziele der bekannten Mappings) werden im
+# Hintergrund frisch gehalten und ohne Yahoo-Abruf beantwortet. Nur auf Wunsch
+# (PREWARM=1 bzw. server.py), sonst ruft jede kalte Serverless-Instanz alle ab
+PREWARMER = Prewarmer(prewarm_fetch, hot_symbols(KNOWN_MAPPINGS.values()),
+                      enabled=os.environ.get('PREWARM') == '1')
+
+# Gemeinsame HTTP-Session für alle Yahoo-Abrufe; setzt der selbst gehostete
+# Server (server.py), auf Vercel bleibt es beim Standard von yfinance
+UPSTREAM_SESSION = None
+
+def upstream_kwargs():
+    """`session=` für yfinance-Aufrufe, falls eine gemeinsame Session gesetzt ist."""
+    return {'session': UPSTREAM_SESSION} if UPSTREAM_SESSION is not None else {}
+
+def new_ticker(symbol):
+    return yf.Ticker(symbol, **upstream_kwargs())
+
+# Freigabe für ?metrics=1&token=... (ohne Token ist der Endpunkt gesperrt)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+def metrics_snapshot():
+    """Perzentile pro Stufe und Single-Flight-Zähler dieser warmen Instanz."""
+    return {
+        "timing": TIMING_STATS.snapshot(),
+        "singleflight": FETCH_FLIGHT.stats(),
+        "prewarm": PREWARMER.stats(),
+        "memory": MEMORY.stats()
+    }
+
+class ResolveError(Exception):
+    """Vorübergehender Fehler bei der Symbol-Auflösung (Netzwerk, Rate-Limit, Timeout).
+
+    Anders als "nichts gefunden" (None) wird das Ergebnis nicht gecacht.
+    """
+
 def smart_symbol_search(user_input):
-    """Intelligente Suche mit verbesserter Fehlerbehandlung."""
+    """Intelligente Suche mit Cache für bereits aufgelöste Eingaben.
+
+    Gecacht werden Treffer und echte Fehlanzeigen (None); ResolveError geht
+    ungecacht an den Aufrufer.
+    """
     user_input = user_input.strip()
+
+    cached = SYMBOL_CACHE.get(user_input, default=False)
+    if cached is not False:
+        logger.info(f"Symbol-Cache Treffer: '{user_input}' -> {cached}")
+        return cached or user_input.upper()
+
+    symbol = resolve_symbol(user_input)
+    SYMBOL_CACHE.set(user_input, symbol)
+    return symbol or user_input.upper()
+
+def resolve_symbol(user_input):
+    """Löst eine Eingabe über Yahoo auf, None wenn nichts gefunden wurde."""
     logger.info(f"Suche Symbol für: '{user_input}'")
     
-    # 1. Direkter Test
-    if is_valid_yahoo_symbol(user_input):
-        logger.info(f"'{user_input}' ist bereits ein gültiges Yahoo Symbol")
+    # 1. Heiße Symbole, bekannte Mappings und lokaler Index (ohne Yahoo-Abruf)
+    if PREWARMER.is_hot(user_input.upper()):
         return user_input.upper()
-    
-    # 2. Bekannte Mappings prüfen
     cleaned = re.sub(r'[^A-Z0-9]', '', user_input.upper())
     if cleaned in KNOWN_MAPPINGS:
         logger.info(f"Bekannte Mapping gefunden: {cleaned} -> {KNOWN_MAPPINGS[cleaned]}")
         return KNOWN_MAPPINGS[cleaned]
     
-    # 3. Format-basierte Suche
+    indexed = INSTRUMENT_INDEX.lookup(user_input) or INSTRUMENT_INDEX.lookup(cleaned)
+    if indexed:
+        logger.info(f"Instrument-Index Treffer: {user_input} -> {indexed}")
+        return indexed
+    
+    # Firmenname im lokalen Index; vor dem Yahoo-Test, wenn die Eingabe
+    # kein Ticker sein kann (Leerzeichen oder langer Name)
     symbol_format = detect_input_format(user_input)
+    name_first = ' ' in user_input.strip() or symbol_format == 'company_name'
+    indexed = INSTRUMENT_INDEX.lookup_name(user_input) if name_first else None
+    if indexed:
+        logger.info(f"Instrument-Index Name gefunden: {user_input} -> {indexed}")
+        return indexed
+    
+    # 2. Direkter Test (lädt dabei die Tageshistorie, die später wiederverwendet wird)
+    if has_daily_history(user_input.upper()):
+        logger.info(f"'{user_input}' ist bereits ein gültiges Yahoo Symbol")
+        return user_input.upper()
+    
+    if not name_first:
+        indexed = INSTRUMENT_INDEX.lookup_name(user_input)
+        if indexed:
+            logger.info(f"Instrument-Index Name gefunden: {user_input} -> {indexed}")
+            return indexed
+    
+    # 3. Format-basierte Suche
     logger.info(f"Erkanntes Format: {symbol_format}")
     
     if symbol_format == "wkn":
@@ -67,14 +212,27 @@ def smart_symbol_search(user_input):
 def is_valid_yahoo_symbol(symbol):
     """Prüft Yahoo Symbol mit Timeout."""
     try:
-        ticker = yf.Ticker(symbol)
-        # Kurzer Test mit minimalen Daten
-        hist = ticker.history(period="1d")
+        with stage('probe'):
+            ticker = new_ticker(symbol)
+            # Kurzer Test mit minimalen Daten
+            hist = ticker.history(period="1d")
         return not hist.empty
     except Exception as e:
         logger.debug(f"Symbol '{symbol}' ist nicht gültig: {e}")
         return False
 
+def has_daily_history(symbol):
+    """Prüft ein Symbol über die volle Tageshistorie aus dem Kerzenspeicher.
+
+    Kostet bei unbekannten Symbolen genau einen Abruf wie der 1d-Test, bei
+    gültigen liegt die Historie danach bereits für get_stock_data bereit.
+    """
+    try:
+        return not BAR_STORE.history(symbol, new_ticker(symbol)).empty
+    except Exception as e:
+        logger.debug(f"Symbol '{symbol}' ist nicht gültig: {e}")
+        return False
+
 def detect_input_format(user_input):
     """Erkennt das Eingabeformat."""
     cleaned = re.sub(r'[^A-Z0-9]', '', user_input.upper())
@@ -88,37 +246,77 @@ def detect_input_format(user_input):
     
     return "unknown"
 
+def probe_symbol(symbol):
+    """Gibt das Symbol zurück, wenn Yahoo Kurse dafür hat, sonst None."""
+    return symbol if is_valid_yahoo_symbol(symbol) else None
+
+def first_match(candidates, deadline=None):
+    """Startet alle Kandidaten parallel und liefert den ersten Treffer in Präferenzreihenfolge.
+
+    Ein Kandidat gewinnt, sobald er und alle bevorzugten Kandidaten vor ihm
+    fertig sind; die Ergebnisse der übrigen werden verworfen (bei freiem
+    Pool laufen sie bereits und enden von selbst). None heißt, dass kein
+    Kandidat einen Treffer hatte; läuft `deadline` ab, kommt ResolveError.
+    """
+    deadline = RESOLVE_DEADLINE if deadline is None else deadline
+    futures = [submit(UPSTREAM_POOL, None, func, arg) for func, arg in candidates]
+    end = time.monotonic() + deadline
+    error = None
+    try:
+        for (func, arg), future in zip(candidates, futures):
+            try:
+                result = future.result(timeout=max(0.0, end - time.monotonic()))
+            except FutureTimeout:
+                logger.warning(f"Symbol-Auflösung nach {deadline}s abgebrochen")
+                raise ResolveError(f"Symbol-Auflösung nach {deadline}s abgebrochen")
+            except ResolveError as e:
+                error = e
+                continue
+            except Exception as e:
+                logger.debug(f"Kandidat {func.__name__}({arg!r}) fehlgeschlagen: {e}")
+                continue
+            if result:
+                return result
+        # Ohne Treffer zählt ein vorübergehender Fehler mehr als "nichts gefunden"
+        if error is not None:
+            raise error
+        return None
+    finally:
+        for future in futures:
+            future.cancel()
+
 def search_by_wkn(wkn):
-    """Suche nach WKN mit deutschen Suffixen."""
-    for suffix in ['.DE', '.F']:
-        test_symbol = wkn + suffix
-        if is_valid_yahoo_symbol(test_symbol):
-            return test_symbol
-    return search_generic(wkn)
+    """Suche nach WKN mit deutschen Suffixen, yfinance.search() erst ohne Treffer."""
+    return first_match([
+        (probe_symbol, wkn + '.DE'),
+        (probe_symbol, wkn + '.F'),
+    ]) or search_generic(wkn)
 
 def search_by_isin(isin):
-    """Suche nach ISIN."""
+    """Suche nach ISIN, yfinance.search() (Rate-Limit) erst ohne Treffer der Probes."""
+    candidates = []
     if isin.startswith('DE'):
-        for suffix in ['.DE', '.F']:
-            test_symbol = isin + suffix
-            if is_valid_yahoo_symbol(test_symbol):
-                return test_symbol
+        candidates = [(probe_symbol, isin + '.DE'), (probe_symbol, isin + '.F')]
     elif isin.startswith('US'):
-        if is_valid_yahoo_symbol(isin):
-            return isin
-    return search_generic(isin)
+        candidates = [(probe_symbol, isin)]
+    return (first_match(candidates) if candidates else None) or search_generic(isin)
 
 def search_by_company_name(company_name):
     """Suche nach Firmenname."""
     return search_generic(company_name)
 
 def search_generic(query):
-    """Generische Suche mit robuster Fehlerbehandlung."""
+    """Generische Suche, None wenn yfinance nichts findet.
+
+    Fehler beim Abruf (Netzwerk, Rate-Limit) werfen ResolveError, damit sie
+    nicht als Fehlanzeige gecacht werden.
+    """
     try:
         logger.info(f"Führe yfinance.search() aus für: '{query}'")
         
         # Versuche yfinance search mit Timeout
-        search_results = yf.search(query, max_results=3)
+        with stage('search'):
+            search_results = yf.search(query, max_results=3)
         
         if search_results is not None and not search_results.empty and len(search_results) > 0:
             best_match = search_results.iloc[0]
@@ -128,171 +326,330 @@ def search_generic(query):
             return symbol
         else:
             logger.warning(f"yfinance.search() fand keine Ergebnisse für '{query}'")
-            return query.upper()
+            return None
             
     except Exception as e:
         logger.error(f"Fehler bei yfinance.search(): {e}")
-        return query.upper()
+        raise ResolveError(f"yfinance.search() für '{query}' fehlgeschlagen: {e}") from e
+
+class StockDataError(Exception):
+    """Fehler, dessen Meldung unverändert an den Client geht."""
+
+def resolve_input(user_input):
+    """Smart Search mit Fallback auf die Eingabe selbst."""
+    try:
+        symbol = smart_symbol_search(user_input)
+        logger.info(f"Konvertiert '{user_input}' zu '{symbol}'")
+    except Exception as e:
+        logger.error(f"Fehler bei Symbol-Suche: {e}")
+        symbol = user_input.upper()
+    return symbol
+
+def validate_info(user_input, info):
+    """Basis-Validierung der ticker.info Daten."""
+    if not info or len(info) < 3:
+        raise StockDataError(f"Keine Daten für '{user_input}' gefunden. Bitte prüfen Sie die Eingabe.")
+
+def cached_info(symbol, ticker):
+    """ticker.info, innerhalb von memory_ttl() aus dem Arbeitsspeicher.
+
+    Gleichzeitige Abrufe desselben Symbols (Einzel-, Batch- und
+    Vergleichs-Endpunkt) teilen sich einen Yahoo-Aufruf.
+    """
+    info = MEMORY.get('info', symbol)
+    if info is None:
+        info, _ = FETCH_FLIGHT.do((symbol, 'info'), _fetch_info, symbol, ticker)
+    return info
+
+def _fetch_info(symbol, ticker):
+    info = ticker.info
+    if info and len(info) >= 3:
+        MEMORY.put('info', symbol, info, ttl=memory_ttl())
+    return info
+
+def fetch_stock_data(symbol, price_range):
+    """Alle Yahoo-Abrufe für ein aufgelöstes Symbol: (info, Tageshistorie, Kursreihe).
+
+    Die volle Tageshistorie (inkl. Dividenden) wird genau einmal über den
+    Kerzenspeicher geladen und für Kursreihe, Preis-Fallback und Dividenden
+    wiederverwendet; ticker.info läuft parallel dazu (bzw. kommt aus MEMORY).
+    """
+    ticker = new_ticker(symbol)
+    info_future = submit(UPSTREAM_POOL, 'info', cached_info, symbol, ticker)
+    daily_future = submit(UPSTREAM_POOL, 'daily', BAR_STORE.history, symbol, ticker)
+    hist_future = None
+    if price_range['interval'] != '1d':
+        hist_future = submit(UPSTREAM_POOL, 'history', ticker.history, **history_kwargs(price_range))
+
+    info = info_future.result()
+    daily = daily_future.result()
+    if hist_future is not None:
+        hist = hist_future.result()
+    else:
+        hist = slice_history(daily, price_range)
+    return info, daily, hist
+
+def get_stock_data(user_input, price_range, price_format='json', points=None, downsample_method='lttb',
+                   indicators=None):
+    """Löst die Eingabe auf, holt alle Daten bei Yahoo und baut die Response.
+
+    Gleichzeitige Anfragen für dasselbe Symbol und denselben Bereich teilen
+    sich einen einzigen Abruf; heiße Symbole (PREWARMER) warten nicht auf Yahoo.
+    """
+    with stage('resolve'):
+        symbol = resolve_input(user_input)
+
+    # Heiße Symbole mit Tageskerzen kommen aus dem Vorwärm-Speicher (ggf. leicht
+    # veraltet, die Erneuerung läuft dann im Hintergrund)
+    PREWARMER.start()
+    with stage('fetch'):
+        hot = PREWARMER.get(symbol) if price_range['interval'] == '1d' else None
+        if hot is not None:
+            info, daily = hot
+            hist = slice_history(daily, price_range)
+        else:
+            key = (symbol, tuple(sorted(price_range.items())))
+            (info, daily, hist), shared = FETCH_FLIGHT.do(key, fetch_stock_data, symbol, price_range)
+            if shared:
+                logger.info(f"Abruf für {symbol} mit laufender Anfrage zusammengelegt")
+
+    validate_info(user_input, info)
+    if hot is None:
+        PREWARMER.put(symbol, info, daily)
+    with stage('build'):
+        return build_stock_data(user_input, symbol, info, daily, hist, price_range, price_format,
+                                points, downsample_method, indicators)
+
+def analytics_for(symbol, daily):
+    """Jahreskennzahlen aus der Tageshistorie, einmal pro Kerzenstand und Tag berechnet."""
+    today = date.today()
+    return BAR_STORE.derived(symbol, 'yearly', metrics_stamp(daily, today),
+                             lambda: yearly_metrics(daily, today))
+
+def build_stock_data(user_input, symbol, info, daily, hist, price_range, price_format='json',
+                     points=None, downsample_method='lttb', indicators=None):
+    """Baut die Response aus bereits geladenen Yahoo-Daten.
+
+    `daily` ist die volle Tageshistorie, `hist` die Kursreihe für den
+    angeforderten Bereich. Bei `price_format='binary'` bzw. `'ndjson'` enthält
+    `prices` die rohen Spalten-Arrays, die der Handler mit encode_binary()
+    verpackt bzw. mit iter_ndjson() streamt.
+    Mit `points` wird die Kursreihe serverseitig auf diese Punktzahl reduziert,
+    `indicators` (aus parse_indicators) liefert Indikatoren zu denselben Zeitpunkten.
+    """
+    # Aktuelle Preise
+    current_price = info.get('currentPrice')
+    previous_close = info.get('previousClose')
+    
+    # Fallback für Preise aus den letzten Tagesschlusskursen
+    if not current_price and not daily.empty:
+        closes = daily['Close'].dropna()
+        if not closes.empty:
+            current_price = float(closes.iloc[-1])
+            if len(closes) > 1:
+                previous_close = float(closes.iloc[-2])
+    
+    if not current_price:
+        raise StockDataError(f"Keine aktuellen Preisdaten für '{user_input}' gefunden.")
+    
+    # Weitere Daten
+    long_name = info.get('longName', info.get('shortName', symbol))
+    currency = info.get('currency', 'EUR')
+    
+    # Marktänderung
+    market_change = None
+    market_change_percent = None
+    if current_price and previous_close and previous_close != 0:
+        market_change = current_price - previous_close
+        market_change_percent = (market_change / previous_close) * 100
+    
+    # Historische Daten
+    columns = price_columns(hist, intraday=is_intraday(price_range))
+    source_count = len(columns['time'])
+    if points:
+        with stage('downsample'):
+            columns = downsample(columns, points, downsample_method)
+    indicator_data = None
+    if indicators:
+        with stage('indicators'):
+            indicator_data = INDICATOR_ENGINE.for_columns(symbol, daily, indicators, columns)
+    if price_format == 'columns':
+        prices = encode_columns(columns)
+    elif price_format in ('binary', 'ndjson'):
+        prices = columns
+    else:
+        prices = rows_from_columns(columns)
+    count = len(columns['time'])
+    first_date, last_date = format_times(columns, columns['time'][[0, -1]]) if count else (None, None)
+    
+    # Dividenden und Jahreskennzahlen (neben den Kerzen zwischengespeichert)
+    with stage('analytics'):
+        yearly = analytics_for(symbol, daily)
+    dividends = annual_dividends(yearly)
+    
+    # Dividendenrendite
+    dividend_yield = 0
+    official_yield = info.get('dividendYield')
+    if official_yield:
+        dividend_yield = official_yield * 100
+    elif dividends and current_price:
+        last_div = dividends[0]['amount'] if dividends else 0
+        if last_div > 0:
+            dividend_yield = (last_div / current_price) * 100
+    
+    # Zusätzliche Infos
+    wkn = info.get('wkn')
+    isin = info.get('isin')
+    sector = info.get('sector')
+    
+    # Response
+    response_data = {
+        "symbol": symbol,
+        "originalInput": user_input,
+        "companyName": long_name,
+        "wkn": wkn,
+        "isin": isin,
+        "sector": sector,
+        "prices": prices,
+        "range": describe_range(price_range, first_date, last_date, count),
+        "downsample": {
+            "method": downsample_method,
+            "points": points,
+            "sourceCount": source_count
+        } if points else None,
+        "currency": currency,
+        "currentPrice": round(current_price, 2) if current_price else None,
+        "previousClose": round(previous_close, 2) if previous_close else None,
+        "marketChange": round(market_change, 2) if market_change else None,
+        "marketChangePercent": round(market_change_percent, 2) if market_change_percent else None,
+        "dividends": dividends,
+        "dividendYield": round(dividend_yield, 2),
+        "indicators": indicator_data,
+        "analytics": {
+            "geoPak10": geopak10(yearly, current_price),
+            "dividendYields": dividend_yields(yearly)
+        }
+    }
+    return response_data
+
+def response_key(user_input, price_range, price_format, points, downsample_method, indicators):
+    """Schlüssel einer fertigen Antwort in MEMORY (alle Parameter, die den Body bestimmen)."""
+    return (user_input.strip(), tuple(sorted(price_range.items())), price_format, points,
+            downsample_method, tuple(indicators or ()))
 
 class handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 für Chunked Transfer-Encoding (format=ndjson); alle anderen
+    # Antworten tragen Content-Length
+    protocol_version = 'HTTP/1.1'
+
     def do_GET(self):
         """Hauptfunktion für Vercel."""
         logger.info("Vercel Function aufgerufen")
-        
-        # CORS Headers setzen
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        timing = begin_request()
+        log_fields = {'status': 'error'}
         
         try:
             # Parse URL
             parsed_url = urlparse(self.path)
             query_params = parse_qs(parsed_url.query)
             
+            # Aggregierte Zeiten dieser Instanz (nur mit METRICS_TOKEN)
+            if 'metrics' in query_params:
+                token = query_params.get('token', [''])[0]
+                if not METRICS_TOKEN or not hmac.compare_digest(token, METRICS_TOKEN):
+                    send_json(self, {'error': 'Metriken sind nicht freigegeben.'})
+                else:
+                    log_fields['status'] = 'metrics'
+                    send_json(self, metrics_snapshot())
+                return
+            
             # Symbol Parameter
             symbol_param = query_params.get('symbol', [None])
             if not symbol_param or not symbol_param[0]:
-                self.end_headers()
-                self.wfile.write(json.dumps({
+                send_json(self, {
                     'error': 'Symbol-Parameter fehlt. Bitte geben Sie ein Symbol, WKN, ISIN oder Firmenname ein.'
-                }).encode('utf-8'))
+                }, headers=server_timing())
                 return
 
             user_input = symbol_param[0]
+            log_fields['input'] = user_input
             
-            # Smart Search
+            # Zeitraum, Intervall, optionales Downsampling und Indikatoren
             try:
-                symbol = smart_symbol_search(user_input)
-                logger.info(f"Konvertiert '{user_input}' zu '{symbol}'")
-            except Exception as e:
-                logger.error(f"Fehler bei Symbol-Suche: {e}")
-                symbol = user_input.upper()
-
-            # Yahoo Finance Daten abrufen
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            
-            # Basis-Validierung
-            if not info or len(info) < 3:
-                self.end_headers()
-                self.wfile.write(json.dumps({
-                    'error': f"Keine Daten für '{user_input}' gefunden. Bitte prüfen Sie die Eingabe."
-                }).encode('utf-8'))
+                with stage('parse'):
+                    price_range = parse_range(query_params)
+                    points, downsample_method = parse_points(query_params)
+                    indicators = parse_indicators(query_params)
+            except ValueError as e:
+                send_json(self, {'error': str(e)}, headers=server_timing())
                 return
             
-            # Aktuelle Preise
-            current_price = info.get('currentPrice')
-            previous_close = info.get('previousClose')
-            
-            # Fallback für Preise
-            if not current_price:
-                try:
-                    current_data = ticker.history(period="2d")
-                    if not current_data.empty:
-                        current_price = current_data['Close'].iloc[-1]
-                        if len(current_data) > 1:
-                            previous_close = current_data['Close'].iloc[-2]
-                except:
-                    pass
-            
-            if not current_price:
-                self.end_headers()
-                self.wfile.write(json.dumps({
-                    'error': f"Keine aktuellen Preisdaten für '{user_input}' gefunden."
-                }).encode('utf-8'))
+            # Antwortformat der Kursreihe
+            price_format = (query_params.get('format', ['json'])[0] or 'json').lower()
+            if price_format not in FORMATS:
+                send_json(self, {'error': f"Ungültiges Format: '{price_format}' (erlaubt: {', '.join(FORMATS)})"},
+                          headers=server_timing())
                 return
             
-            # Weitere Daten
-            long_name = info.get('longName', info.get('shortName', symbol))
-            currency = info.get('currency', 'EUR')
-            
-            # Marktänderung
-            market_change = None
-            market_change_percent = None
-            if current_price and previous_close and previous_close != 0:
-                market_change = current_price - previous_close
-                market_change_percent = (market_change / previous_close) * 100
-            
-            # Historische Daten
-            hist = ticker.history(period="max", interval="1d")
-            prices = []
-            if not hist.empty:
-                for index, row in hist.iterrows():
-                    if not (row[['Open', 'High', 'Low', 'Close']].isnull().any()):
-                        prices.append({
-                            "date": index.date().isoformat(),
-                            "open": round(float(row['Open']), 2),
-                            "high": round(float(row['High']), 2),
-                            "low": round(float(row['Low']), 2),
-                            "close": round(float(row['Close']), 2),
-                            "volume": int(row['Volume'])
-                        })
-            
-            # Dividenden
-            dividends_df = ticker.dividends
-            dividends = []
-            if not dividends_df.empty:
-                current_year = datetime.now().year
-                annual_dividends = {}
-                for index, value in dividends_df.items():
-                    div_year = index.year
-                    if div_year >= current_year - 10:
-                        annual_dividends[div_year] = annual_dividends.get(div_year, 0) + value
-                
-                for year, amount in annual_dividends.items():
-                    dividends.append({"year": year, "amount": round(amount, 2)})
-                dividends.sort(key=lambda x: x['year'], reverse=True)
-            
-            # Dividendenrendite
-            dividend_yield = 0
-            official_yield = info.get('dividendYield')
-            if official_yield:
-                dividend_yield = official_yield * 100
-            elif dividends and current_price:
-                last_div = dividends[0]['amount'] if dividends else 0
-                if last_div > 0:
-                    dividend_yield = (last_div / current_price) * 100
-            
-            # Zusätzliche Infos
-            wkn = info.get('wkn')
-            isin = info.get('isin')
-            sector = info.get('sector')
-            
-            # Response
-            response_data = {
-                "symbol": symbol,
-                "originalInput": user_input,
-                "companyName": long_name,
-                "wkn": wkn,
-                "isin": isin,
-                "sector": sector,
-                "prices": prices,
-                "currency": currency,
-                "currentPrice": round(current_price, 2) if current_price else None,
-                "previousClose": round(previous_close, 2) if previous_close else None,
-                "marketChange": round(market_change, 2) if market_change else None,
-                "marketChangePercent": round(market_change_percent, 2) if market_change_percent else None,
-                "dividends": dividends,
-                "dividendYield": round(dividend_yield, 2)
-            }
+            # Fertig kodierte Antwort aus dem Arbeitsspeicher (nicht für Streams)
+            key = response_key(user_input, price_range, price_format, points, downsample_method, indicators)
+            entry = MEMORY.get('response', key) if price_format != 'ndjson' else None
+            if entry is not None:
+                log_fields.update(status='ok', symbol=entry['symbol'], format=price_format, memory=True)
+                self.send_entry(key, entry)
+                return
+
+            try:
+                response_data = get_stock_data(user_input, price_range, price_format, points,
+                                               downsample_method, indicators)
+            except StockDataError as e:
+                send_json(self, {'error': str(e)}, headers=server_timing())
+                return
+            log_fields.update(status='ok', symbol=response_data['symbol'], format=price_format)
             
-            self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode('utf-8'))
-            logger.info(f"Erfolgreich: {symbol} für '{user_input}'")
+            # Mit ETag, Cache-Control, Komprimierung und Server-Timing
+            if price_format == 'binary':
+                columns = response_data.pop('prices')
+                with stage('serialize'):
+                    body = encode_binary(response_data, columns)
+                self.send_entry(key, self.remember(key, response_data['symbol'], body, 'application/octet-stream'))
+            elif price_format == 'ndjson':
+                # Serialisierung läuft beim Senden; die Zeit steht nur im Log
+                columns = response_data.pop('prices')
+                headers = server_timing()
+                with stage('stream'):
+                    send_stream(self, iter_ndjson(response_data, columns), cache=True, headers=headers)
+            else:
+                with stage('serialize'):
+                    body = json.dumps(response_data).encode('utf-8')
+                self.send_entry(key, self.remember(key, response_data['symbol'], body, 'application/json'))
+            logger.info(f"Erfolgreich: {response_data['symbol']} für '{user_input}'")
             
         except Exception as e:
             logger.error(f"Fehler in handler: {e}", exc_info=True)
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                'error': f'Serverfehler: {str(e)}'
-            }).encode('utf-8'))
+            send_server_error(self, f'Serverfehler: {str(e)}', headers=server_timing())
+        finally:
+            finish_request(timing, aggregate=log_fields['status'] == 'ok', **log_fields)
     
+    def remember(self, key, symbol, body, content_type):
+        """Legt eine kodierte Antwort für memory_ttl() in MEMORY ab."""
+        # Komprimierte Fassungen vor dem Ablegen, damit der geteilte Eintrag
+        # unverändert bleibt und sie zum Budget zählen
+        with stage('compress'):
+            variants = compress_variants(body)
+        entry = {'symbol': symbol, 'body': body, 'contentType': content_type,
+                 'etag': make_etag(body), 'variants': variants}
+        MEMORY.put('response', key, entry, ttl=memory_ttl())
+        return entry
+
+    def send_entry(self, key, entry):
+        send_body(self, entry['body'], content_type=entry['contentType'], cache=True, etag=entry['etag'],
+                  headers=server_timing(), variants=entry['variants'])
+
     def do_OPTIONS(self):
         """CORS Preflight."""
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        for name, value in CORS_HEADERS.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
         self.end_headers()
@@ -0,0 +1,140 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.server import BaseHTTPRequestHandler
+import logging
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from getstockdata import BAR_STORE, INSTRUMENT_INDEX, PREWARMER, resolve_input, upstream_kwargs
+from _analytics import metrics_stamp
+from _history import parse_symbols, load_histories
+from _http import CORS_HEADERS, send_json
+from _screener import parse_sort, compute_rows, rank
+from _timing import begin_request, finish_request, server_timing, stage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Obergrenze pro Anfrage und Anzahl paralleler Yahoo-Abrufe
+MAX_SYMBOLS = int(os.environ.get('SCREENER_MAX_SYMBOLS', 250))
+MAX_WORKERS = int(os.environ.get('SCREENER_MAX_WORKERS', 16))
+
+# Vordefinierte Universen aus dem lokalen Instrument-Index (_instruments.csv)
+UNIVERSES = {
+    'all': lambda symbol: True,
+    'de': lambda symbol: symbol.endswith('.DE'),
+    'us': lambda symbol: '.' not in symbol,
+}
+
+def parse_universe(query_params):
+    """Eingaben aus `symbols=`/`symbol=` und/oder `universe=all|de|us`."""
+    inputs = parse_symbols(query_params)
+    for name in query_params.get('universe', []):
+        name = name.strip().lower()
+        if name not in UNIVERSES:
+            raise ValueError(f"Unbekanntes Universum: '{name}' (erlaubt: {', '.join(UNIVERSES)})")
+        inputs.extend(item['symbol'] for item in INSTRUMENT_INDEX.instruments if UNIVERSES[name](item['symbol']))
+    return list(dict.fromkeys(inputs))
+
+def parse_limit(query_params):
+    """`limit=` für die Anzahl Zeilen, 0 bzw. fehlend für alle."""
+    value = query_params.get('limit', ['0'])[0] or '0'
+    if not value.isdigit():
+        raise ValueError(f"Ungültiges Limit: '{value}' (erwartet: positive ganze Zahl)")
+    return int(value)
+
+def screen(inputs, sort='geoPak10', order='desc', limit=None):
+    """Kennzahlen und Rangliste für alle Eingaben; fehlgeschlagene landen in `failed`."""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        with stage('resolve'):
+            symbols = list(pool.map(resolve_input, inputs))
+        unique = list(dict.fromkeys(symbols))
+        with stage('fetch'):
+            frames = load_histories(pool, BAR_STORE, unique, PREWARMER, **upstream_kwargs())
+
+    # Bereits berechnete Zeilen (gleicher Kerzenstand und Tag) kommen aus dem Kerzenspeicher
+    today = date.today()
+    rows = {}
+    todo = []
+    with stage('metrics'):
+        for symbol in unique:
+            daily = frames.get(symbol)
+            if daily is None or daily.empty:
+                continue
+            stamp = metrics_stamp(daily, today)
+            row = BAR_STORE.derived_cached(symbol, 'screen', stamp)
+            if row is not None:
+                rows[symbol] = row
+            else:
+                todo.append((symbol, daily, stamp))
+        computed = compute_rows([(symbol, daily) for symbol, daily, _ in todo], today)
+        for (symbol, _, stamp), row in zip(todo, computed):
+            if row is not None:
+                rows[symbol] = BAR_STORE.derived(symbol, 'screen', stamp, lambda: row)
+
+    failed = []
+    for user_input, symbol in zip(inputs, symbols):
+        if symbol not in rows:
+            failed.append({"symbol": symbol, "originalInput": user_input,
+                           "error": f"Keine Kursdaten für '{user_input}' gefunden."})
+    names = {item['symbol']: item['name'] for item in INSTRUMENT_INDEX.instruments}
+    table = rank([dict(row, name=names.get(symbol)) for symbol, row in rows.items()], sort, order)
+    return {
+        "sort": sort,
+        "order": order,
+        "count": len(table),
+        "rows": table[:limit] if limit else table,
+        "failed": failed,
+        "computed": len(todo),
+    }
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        """Rangliste mehrerer Aktien nach GeoPAK10, Dividendenrendite, Volatilität oder Drawdown."""
+        logger.info("Vercel Function (Screener) aufgerufen")
+        timing = begin_request()
+        log_fields = {'status': 'error'}
+
+        try:
+            query_params = parse_qs(urlparse(self.path).query)
+            try:
+                with stage('parse'):
+                    inputs = parse_universe(query_params)
+                    sort, order = parse_sort(query_params)
+                    limit = parse_limit(query_params)
+            except ValueError as e:
+                send_json(self, {'error': str(e)}, headers=server_timing())
+                return
+            if not inputs:
+                send_json(self, {
+                    'error': 'Symbols- oder Universe-Parameter fehlt (z.B. symbols=SAP.DE,ALV.DE oder universe=de).'
+                }, headers=server_timing())
+                return
+            if len(inputs) > MAX_SYMBOLS:
+                send_json(self, {
+                    'error': f'Zu viele Symbole ({len(inputs)}), maximal {MAX_SYMBOLS} pro Anfrage.'
+                }, headers=server_timing())
+                return
+
+            result = screen(inputs, sort, order, limit)
+            log_fields.update(status='ok', symbols=len(inputs), failed=len(result['failed']))
+            send_json(self, result, cache=result['count'] > 0, headers=server_timing())
+            logger.info(f"Screener erfolgreich: {result['count']}/{len(inputs)} Symbole")
+
+        except Exception as e:
+            logger.error(f"Fehler in Screener: {e}", exc_info=True)
+            send_json(self, {
+                'error': f'Serverfehler: {str(e)}'
+            }, headers=server_timing())
+        finally:
+            finish_request(timing, aggregate=log_fields['status'] == 'ok', **log_fields)
+
+    def do_OPTIONS(self):
+        """CORS Preflight."""
+        self.send_response(200)
+        for name, value in CORS_HEADERS.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
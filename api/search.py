@@ -0,0 +1,47 @@
+import os
+import sys
+from http.server import BaseHTTPRequestHandler
+import logging
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _http import CORS_HEADERS, send_json
+from _instruments import InstrumentIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_LIMIT = 25
+
+# Index einmal pro Instanz laden
+INSTRUMENT_INDEX = InstrumentIndex.load()
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        """Autocomplete für das Suchfeld, ohne Yahoo-Abruf."""
+        try:
+            query_params = parse_qs(urlparse(self.path).query)
+            query = (query_params.get('q', [''])[0] or '').strip()
+            try:
+                limit = max(1, min(int(query_params.get('limit', ['10'])[0]), MAX_LIMIT))
+            except ValueError:
+                limit = 10
+            
+            results = INSTRUMENT_INDEX.search(query, limit=limit) if query else []
+            send_json(self, {
+                "query": query,
+                "results": results
+            }, cache=True)
+            
+        except Exception as e:
+            logger.error(f"Fehler in Suche: {e}", exc_info=True)
+            send_json(self, {
+                'error': f'Serverfehler: {str(e)}'
+            })
+    
+    def do_OPTIONS(self):
+        """CORS Preflight."""
+        self.send_response(200)
+        for name, value in CORS_HEADERS.items():
+            self.send_header(name, value)
+        self.end_headers()
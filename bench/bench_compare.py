@@ -0,0 +1,96 @@
+"""Benchmark: Vergleich vieler Symbole über 20 Jahre.
+
+Misst compare() (api/compare.py) gegen das Fake-yfinance für
+  - kalt: leerer Kerzenspeicher, Historien per Bulk-Download,
+  - warm: Kerzen im Arbeitsspeicher,
+und getrennt die reine Rechnung (Ausrichten, Wechselkurse, Matrizen) auf
+den geladenen Historien. Die Hälfte der Symbole notiert in USD und wird in
+EUR umgerechnet, mit unterschiedlichen Börsenfeiertagen.
+
+Aufruf: python bench/bench_compare.py [symbole ...]
+"""
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+YEARS = 20
+ROWS = YEARS * 261
+
+
+def setup():
+    global fake_yfinance, compare, _tmp
+    _tmp = tempfile.mkdtemp(prefix='stockanalyzer-compare-')
+    sys.path.insert(0, BENCH_DIR)
+    import fake_yfinance
+    fake_yfinance.install()
+    os.environ['SYMBOL_CACHE_PATH'] = ''
+    os.environ['BAR_STORE_DIR'] = _tmp
+    os.environ['PREWARM'] = '0'
+    sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'api'))
+    logging.disable(logging.CRITICAL)
+    import compare
+
+
+def fresh_store():
+    import getstockdata
+    shutil.rmtree(_tmp, ignore_errors=True)
+    getstockdata.MEMORY.clear()
+    getstockdata.BAR_STORE = compare.BAR_STORE = getstockdata.LazyObject(getstockdata._bar_store)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    setup()
+    counts = [int(arg) for arg in sys.argv[1:]] or [10, 50, 100]
+    from _timerange import parse_range
+    price_range = parse_range({'period': ['20y']})
+
+    print(f"{YEARS} Jahre Tageskurse, Hälfte in USD (Umrechnung in EUR), Upstream-Latenz 20 ms")
+    print(f"{'Symbole':>8} {'kalt':>9} {'warm':>9} {'Rechnung':>9} {'Tage':>6} {'Renditen':>9} {'Antwort':>9}")
+    try:
+        for count in counts:
+            de = [f'CMP{i:03d}.DE' for i in range(count - count // 2)]
+            us = [f'CMP{i:03d}' for i in range(count // 2)]
+            fake_yfinance.add_symbols(de, rows=ROWS, holidays=['05-01', '12-24', '12-31'])
+            fake_yfinance.add_symbols(us, rows=ROWS, currency='USD', timezone='America/New_York',
+                                      holidays=['07-04', '11-27'])
+            fake_yfinance.preload()
+            fake_yfinance.reset(0.02)
+            inputs = de + us
+
+            fresh_store()
+            cold, _ = timed(compare.compare, inputs, price_range)
+            warm, result = timed(compare.compare, inputs, price_range)
+
+            # Nur die Rechnung: Historien bereits geladen
+            loaded = compare.load_histories
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                frames = loaded(pool, compare.BAR_STORE, inputs + ['USDEUR=X'])
+            compare.load_histories = lambda pool, store, symbols, *args, **kwargs: {
+                s: frames[s] for s in symbols if s in frames
+            }
+            try:
+                compute, _ = timed(compare.compare, inputs, price_range)
+            finally:
+                compare.load_histories = loaded
+
+            size = len(json.dumps(result)) / 1e6
+            print(f"{count:>8} {cold * 1000:7.0f} ms {warm * 1000:7.0f} ms {compute * 1000:7.0f} ms "
+                  f"{len(result['dates']):>6} {result['observations']:>9} {size:7.1f} MB")
+    finally:
+        shutil.rmtree(_tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark: Payload-Größe, Kodierzeit und Spitzenspeicher der Antwortformate.
+
+Bei ndjson wird für den Spitzenspeicher wie im Handler Block für Block
+verworfen statt den ganzen Body zusammenzusetzen.
+
+Aufruf: python bench/bench_formats.py [zeilen]
+"""
+import gzip
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'api'))
+
+from bench_serialize import make_history
+from _serialize import price_columns, rows_from_columns, encode_columns, encode_binary, iter_ndjson
+
+
+def best_of(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(func):
+    """Spitzenspeicher (tracemalloc) eines Aufrufs inklusive Ergebnis."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def drain(chunks):
+    """Verbraucht einen Block-Iterator wie send_stream(), ohne die Blöcke zu behalten."""
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+    return total
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 12_000
+    hist = make_history(rows)
+    meta = {'symbol': 'TEST', 'currency': 'EUR'}
+
+    encoders = {
+        'json': lambda: json.dumps(rows_from_columns(price_columns(hist))).encode('utf-8'),
+        'columns': lambda: json.dumps(encode_columns(price_columns(hist))).encode('utf-8'),
+        'binary': lambda: encode_binary(meta, price_columns(hist)),
+        'ndjson': lambda: b''.join(iter_ndjson(meta, price_columns(hist))),
+    }
+    streamed = {
+        'ndjson': lambda: drain(iter_ndjson(meta, price_columns(hist))),
+    }
+    print(f"Zeilen: {rows}")
+    print(f"{'Format':<9} {'roh':>10} {'gzip':>10} {'kodieren':>10} {'json.loads':>11} {'Spitze':>10}")
+    for name, encode in encoders.items():
+        elapsed, body = best_of(encode)
+        if name in ('binary', 'ndjson'):
+            parse = '-'
+        else:
+            parse = f"{best_of(lambda: json.loads(body))[0] * 1000:8.1f} ms"
+        peak = peak_memory(streamed.get(name, encode))
+        print(f"{name:<9} {len(body):>10,} {len(gzip.compress(body)):>10,} "
+              f"{elapsed * 1000:7.1f} ms {parse:>11} {peak / 1e6:7.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark: Indikatoren über lange Tageshistorien, voll und inkrementell.
+
+Rechnet ein Dutzend Indikatoren über ~40 Jahre Tageskerzen, danach nur
+mit einer geänderten letzten und einer neuen Kerze (IndicatorEngine).
+
+Aufruf: python bench/bench_indicators.py [zeilen]
+"""
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'api'))
+
+from bench_serialize import make_history
+from _indicators import IndicatorEngine, parse_indicators
+
+SPECS = 'sma20,sma50,sma200,ema12,ema26,ema200,rsi,macd,bb20,vol20,vol60,drawdown'
+
+
+def best_of(func, repeat=7):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_400
+    hist = make_history(rows + 1)
+    specs = parse_indicators({'indicators': [SPECS]})
+    base = hist.iloc[:-1]
+    # Laufender Handelstag: letzte Kerze geändert, eine neue angehängt
+    updated = hist.copy()
+    updated.iloc[-2, updated.columns.get_loc('Close')] *= 1.002
+
+    def full():
+        IndicatorEngine().compute('TEST', base, specs)
+
+    engine = IndicatorEngine()
+
+    def incremental():
+        engine.compute('TEST', base, specs)
+        start = time.perf_counter()
+        engine.compute('TEST', updated, specs)
+        return time.perf_counter() - start
+
+    def unchanged():
+        engine.compute('TEST', updated, specs)
+
+    print(f"Zeilen: {rows}, Indikatoren: {len(specs)}")
+    print(f"voll          {best_of(full) * 1000:7.2f} ms")
+    print(f"inkrementell  {min(incremental() for _ in range(7)) * 1000:7.2f} ms")
+    print(f"unverändert   {best_of(unchanged) * 1000:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark: Screener über ein großes synthetisches Universum.
+
+Misst screen() (api/screener.py) gegen das Fake-yfinance für
+  - kalt: leerer Kerzenspeicher, alle Historien per Bulk-Download,
+  - warm (neu rechnen): Kerzen gespeichert, Kennzahlen ohne Cache,
+  - warm: Kerzen und Kennzahlen gespeichert,
+jeweils mit Kennzahlen im Prozess und (bei mehr als einer CPU) im Prozesspool.
+
+Aufruf: python bench/bench_screener.py [symbole] [prozesse]
+"""
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def setup():
+    """Fake installieren und die API importieren (nicht in Pool-Prozessen,
+    die dieses Modul per 'spawn' als __mp_main__ erneut laden)."""
+    global fake_yfinance, _screener, getstockdata, screener, _tmp
+    _tmp = tempfile.mkdtemp(prefix='stockanalyzer-screener-')
+    sys.path.insert(0, BENCH_DIR)
+    import fake_yfinance
+    fake_yfinance.install()
+    os.environ['SYMBOL_CACHE_PATH'] = ''
+    os.environ['BAR_STORE_DIR'] = _tmp
+    os.environ['PREWARM'] = '0'
+    sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'api'))
+    logging.disable(logging.CRITICAL)
+    import _screener
+    import getstockdata
+    import screener
+
+
+def fresh_store():
+    shutil.rmtree(_tmp, ignore_errors=True)
+    getstockdata.BAR_STORE = screener.BAR_STORE = getstockdata.LazyObject(getstockdata._bar_store)
+
+
+def clear_metrics():
+    store = screener.BAR_STORE
+    store._derived.clear()
+    for name in os.listdir(_tmp):
+        if name.endswith('.derived.json'):
+            os.remove(os.path.join(_tmp, name))
+
+
+def timed(inputs, processes):
+    _screener.DEFAULT_PROCESSES = processes
+    start = time.perf_counter()
+    result = screener.screen(inputs, sort='geoPak10')
+    return time.perf_counter() - start, result
+
+
+def main():
+    setup()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else max(2, os.cpu_count() or 1)
+    inputs = [f'SCR{i:03d}.DE' for i in range(count)] + ['FAIL.DE', 'UNKNOWN']
+    fake_yfinance.add_symbols(inputs[:count], rows=6500)
+    fake_yfinance.preload()
+    fake_yfinance.reset(0.05)
+
+    print(f"{count} Symbole + 2 ungültige, Upstream-Latenz 50 ms, Pool mit {processes} Prozessen")
+    print(f"{'Lauf':<32} {'Prozesse':>8} {'Zeit':>9} {'gerechnet':>10} {'Zeilen':>7} {'Fehler':>7}")
+    try:
+        runs = [('im Prozess', 1)]
+        if _screener.CPUS > 1:
+            runs.append(('Prozesspool', processes))
+        else:
+            print("(nur eine CPU: Kennzahlen immer im Prozess, kein Pool-Lauf)")
+        for label, procs in runs:
+            fresh_store()
+            # Prozesspool vorab starten, damit der Start nicht in "kalt" fällt
+            if procs > 1 and _screener._process_pool(procs) is not None:
+                list(_screener._pool.map(abs, range(procs)))
+            for run in ('kalt', 'warm (neu rechnen)', 'warm'):
+                if run == 'warm (neu rechnen)':
+                    clear_metrics()
+                seconds, result = timed(inputs, procs)
+                print(f"{run + ', ' + label:<32} {procs:>8} {seconds * 1000:7.0f} ms {result['computed']:>10} "
+                      f"{result['count']:>7} {len(result['failed']):>7}")
+        top = result['rows'][:3]
+        print("\nTop 3 nach GeoPAK10:", ', '.join(f"{r['symbol']} {r['geoPak10']}%" for r in top))
+    finally:
+        shutil.rmtree(_tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Micro-Benchmark: iterrows()-Serialisierung vs. spaltenweise serialize_prices().
+
+Aufruf: python bench/bench_serialize.py [zeilen]
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+from _serialize import serialize_prices
+
+
+def make_history(rows, seed=42):
+    """Erzeugt einen history()-ähnlichen Frame mit einzelnen NaN-Zeilen."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end='2024-12-31', periods=rows, tz='Europe/Berlin', name='Date')
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, rows)))
+    hist = pd.DataFrame({
+        'Open': close * rng.uniform(0.98, 1.02, rows),
+        'High': close * rng.uniform(1.0, 1.03, rows),
+        'Low': close * rng.uniform(0.97, 1.0, rows),
+        'Close': close,
+        'Volume': rng.integers(10_000, 10_000_000, rows),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=index)
+    hist.iloc[rng.choice(rows, size=rows // 500 + 1, replace=False), 0] = np.nan
+    return hist
+
+
+def serialize_prices_iterrows(hist):
+    """Bisherige Implementierung aus handler.do_GET als Referenz."""
+    prices = []
+    if not hist.empty:
+        for index, row in hist.iterrows():
+            if not (row[['Open', 'High', 'Low', 'Close']].isnull().any()):
+                prices.append({
+                    "date": index.date().isoformat(),
+                    "open": round(float(row['Open']), 2),
+                    "high": round(float(row['High']), 2),
+                    "low": round(float(row['Low']), 2),
+                    "close": round(float(row['Close']), 2),
+                    "volume": int(row['Volume'])
+                })
+    return prices
+
+
+def best_of(func, arg, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 12_000
+    hist = make_history(rows)
+
+    legacy = json.dumps(serialize_prices_iterrows(hist))
+    vectorized = json.dumps(serialize_prices(hist))
+    assert legacy == vectorized, "JSON ist nicht bytegleich"
+
+    t_legacy = best_of(serialize_prices_iterrows, hist, 3)
+    t_vectorized = best_of(serialize_prices, hist, 10)
+    print(f"Zeilen:      {rows}")
+    print(f"iterrows():  {t_legacy * 1000:8.1f} ms")
+    print(f"vektoriell:  {t_vectorized * 1000:8.1f} ms")
+    print(f"Speedup:     {t_legacy / t_vectorized:8.1f}x (JSON bytegleich)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Lasttest: asyncio-Server (server.py) gegen ThreadingHTTPServer mit dem Vercel-Handler.
+
+Beide Server laufen in eigenen Prozessen gegen das Fake-yfinance (jede
+Anfrage wartet auf einen simulierten info-Abruf). Ein asyncio-Client hält
+N Keep-Alive-Verbindungen offen und schickt darüber so schnell wie möglich
+Anfragen; gemessen werden Durchsatz, Latenz, 503 (Gegendruck) und
+Verbindungsfehler bzw. Timeouts.
+
+Aufruf: python bench/bench_server.py [--clients 50 200 1000] [--seconds 10]
+        [--latency 50] [--timeout 10]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+PATH = '/api/getstockdata?symbol=SAP.DE&period=1y&points=200&format=binary'
+
+# Kindprozess: Fake installieren, Server starten, Port auf stdout melden
+CHILD = r'''
+import os, sys, tempfile, logging
+os.environ['SYMBOL_CACHE_PATH'] = ''
+os.environ['BAR_STORE_DIR'] = tempfile.mkdtemp(prefix='stockanalyzer-server-')
+os.environ['PREWARM'] = '0'
+sys.path[:0] = [{root!r}, {api!r}, {bench!r}]
+import fake_yfinance
+fake_yfinance.install()
+fake_yfinance.reset({latency!r})
+logging.disable(logging.CRITICAL)
+def ready(port):
+    print(port, flush=True)
+if {kind!r} == 'async':
+    import asyncio, server
+    asyncio.run(server.serve(port=0, ready=ready))
+else:
+    import threading
+    from http.server import ThreadingHTTPServer
+    import getstockdata
+    class Quiet(getstockdata.handler):
+        def log_message(self, *args):
+            pass
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Quiet)
+    httpd.daemon_threads = True
+    ready(httpd.server_port)
+    httpd.serve_forever()
+'''
+
+
+def start_server(kind, latency):
+    code = CHILD.format(root=ROOT_DIR, api=os.path.join(ROOT_DIR, 'api'), bench=BENCH_DIR,
+                        latency=latency, kind=kind)
+    proc = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    port = int(proc.stdout.readline())
+    return proc, port
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    close = False
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        name = name.strip().lower()
+        if name == b'content-length':
+            length = int(value)
+        elif name == b'connection' and value.strip().lower() == b'close':
+            close = True
+    await reader.readexactly(length)
+    return status, close
+
+
+async def client(port, deadline, timeout, stats):
+    request = (f'GET {PATH} HTTP/1.1\r\nHost: bench\r\nConnection: keep-alive\r\n\r\n').encode()
+    conn = None
+    while time.perf_counter() < deadline:
+        try:
+            if conn is None:
+                conn = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+            reader, writer = conn
+            start = time.perf_counter()
+            writer.write(request)
+            status, close = await asyncio.wait_for(read_response(reader), timeout)
+            stats['latencies'].append(time.perf_counter() - start)
+            stats['status'][status] = stats['status'].get(status, 0) + 1
+            if status == 503:
+                await asyncio.sleep(0.1)
+            if close:
+                writer.close()
+                conn = None
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            stats['errors'] += 1
+            if conn is not None:
+                conn[1].close()
+                conn = None
+            await asyncio.sleep(0.1)
+    if conn is not None:
+        conn[1].close()
+
+
+async def load(port, clients, seconds, timeout):
+    stats = {'latencies': [], 'status': {}, 'errors': 0}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client(port, deadline, timeout, stats) for _ in range(clients)))
+    return stats
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return float('nan')
+    return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--clients', type=int, nargs='*', default=[50, 200, 1000])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--latency', type=float, default=50, help='Upstream-Latenz in ms')
+    parser.add_argument('--timeout', type=float, default=10, help='Client-Timeout in s')
+    args = parser.parse_args()
+
+    print(f"{PATH}\nUpstream-Latenz {args.latency:.0f} ms, {args.seconds:.0f} s pro Lauf, Timeout {args.timeout:.0f} s")
+    print(f"{'Server':<10} {'Clients':>7} {'OK/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'503':>6} {'Fehler':>7}")
+    for kind in ('threading', 'async'):
+        proc, port = start_server(kind, args.latency / 1000)
+        try:
+            # Aufwärmen (Kerzenspeicher, Importe)
+            asyncio.run(load(port, 1, 1, args.timeout))
+            for clients in args.clients:
+                stats = asyncio.run(load(port, clients, args.seconds, args.timeout))
+                ok = stats['status'].get(200, 0)
+                latencies = sorted(stats['latencies'])
+                print(f"{kind:<10} {clients:>7} {ok / args.seconds:>8.1f} {percentile(latencies, 50) * 1000:>8.1f} "
+                      f"{percentile(latencies, 99) * 1000:>8.1f} {stats['status'].get(503, 0):>6} {stats['errors']:>7}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Benchmark: Kaltstart der Serverless-Funktion api/getstockdata.py.
+
+Misst in jeweils frischen Prozessen
+  - die Importzeit laut `python -X importtime` (gesamt und größte Module),
+  - die Zeit bis zur ersten Antwort für typische Kaltstart-Anfragen
+    (Validierungsfehler, Symbolauflösung über den lokalen Index, Abruf).
+
+Der Abruf läuft gegen bench/fake_yfinance.py, das wie das echte yfinance
+erst beim ersten Zugriff geladen wird (pandas/numpy inklusive); die
+Importzeit des echten yfinance steht getrennt in der ersten Tabelle.
+
+Aufruf: python bench/bench_startup.py [wiederholungen] [--record datei.jsonl]
+
+Mit --record wird das Ergebnis als JSON-Zeile (mit Commit und Zeitstempel)
+an die Datei angehängt, um den Verlauf über Commits zu verfolgen.
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..', 'api'))
+
+# Kindprozess: startet die Funktion hinter einem lokalen HTTP-Server und
+# stellt genau eine Anfrage; gibt die Zeiten als JSON aus.
+CHILD = r'''
+import time
+started = time.perf_counter()
+import http.client, json, os, sys, tempfile, threading
+os.environ['SYMBOL_CACHE_PATH'] = ''
+os.environ['BAR_STORE_DIR'] = tempfile.mkdtemp(prefix='stockanalyzer-startup-')
+sys.path[:0] = [{api!r}, {bench!r}]
+from _lazy import lazy_import
+fake = lazy_import('fake_yfinance')
+sys.modules['yfinance'] = fake
+import logging
+logging.disable(logging.INFO)
+from http.server import HTTPServer
+import getstockdata
+imported = time.perf_counter()
+server = HTTPServer(('127.0.0.1', 0), getstockdata.handler)
+threading.Thread(target=server.handle_request, daemon=True).start()
+conn = http.client.HTTPConnection('127.0.0.1', server.server_port)
+conn.request('GET', {path!r})
+response = conn.getresponse()
+body = response.read()
+done = time.perf_counter()
+print(json.dumps({{
+    'import': imported - started,
+    'firstResponse': done - started,
+    'status': response.status,
+    'loaded': sorted(m for m in ('numpy', 'pandas', 'fake_yfinance')
+                     if type(sys.modules.get(m)).__name__ == 'module'),
+}}))
+'''
+
+SCENARIOS = [
+    ('ohne Symbol', '/api/getstockdata'),
+    ('ungültiger Parameter', '/api/getstockdata?symbol=SAP&period=abc'),
+    ('Abruf (Fake, 0 ms)', '/api/getstockdata?symbol=716460&period=1y'),
+]
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def importtime(module, top=8):
+    """Kumulierte Importzeit eines Moduls und seiner teuersten direkten Importe (ms)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=API_DIR, capture_output=True, text=True, env=dict(os.environ, SYMBOL_CACHE_PATH='')
+    )
+    # Ausgabe in Post-Order: direkte Importe stehen eingerückt vor ihrem Modul
+    children = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        depth, name, ms = len(match.group(3)), match.group(4), int(match.group(2)) / 1000
+        if depth == 1:
+            if name == module:
+                return ms, sorted(children, reverse=True)[:top]
+            children = []
+        elif depth == 3:
+            children.append((ms, name))
+    return None, []
+
+
+def first_response(path):
+    """Startet einen frischen Interpreter und misst bis zur ersten Antwort."""
+    code = CHILD.format(api=API_DIR, bench=BENCH_DIR, path=path)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    data['wall'] = wall
+    return data
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = sys.argv[1:]
+    record = None
+    if '--record' in args:
+        i = args.index('--record')
+        record = args[i + 1]
+        del args[i:i + 2]
+    repeat = int(args[0]) if args else 5
+
+    report = {'imports': {}, 'requests': {}}
+    print(f"{'Import':<14} {'kumuliert':>10}   teuerste direkte Importe")
+    for module in ('getstockdata', 'yfinance'):
+        total, children = importtime(module)
+        report['imports'][module] = total
+        detail = ', '.join(f'{name} {ms:.0f}' for ms, name in children[:4])
+        print(f"{module:<14} {total or 0:7.1f} ms   {detail}")
+
+    print(f"\n{'Kaltstart':<22} {'Import':>9} {'1. Antwort':>11} {'Prozess':>9}   geladen")
+    for name, path in SCENARIOS:
+        runs = [first_response(path) for _ in range(repeat)]
+        summary = {
+            key: statistics.median(r[key] for r in runs) * 1000
+            for key in ('import', 'firstResponse', 'wall')
+        }
+        summary['loaded'] = runs[-1]['loaded']
+        report['requests'][name] = summary
+        print(f"{name:<22} {summary['import']:6.1f} ms {summary['firstResponse']:8.1f} ms "
+              f"{summary['wall']:6.1f} ms   {', '.join(summary['loaded']) or '-'}")
+
+    if record:
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': git_commit(),
+            'python': sys.version.split()[0],
+            'repeat': repeat,
+            **report,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(record)), exist_ok=True)
+        with open(record, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+        print(f"\nErgebnis an {record} angehängt")
+
+
+if __name__ == '__main__':
+    main()
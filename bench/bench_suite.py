@@ -0,0 +1,265 @@
+"""Offline-Benchmark-Suite für /api/getstockdata gegen das Fake-yfinance.
+
+Treibt `handler` wahlweise im Prozess (ohne Socket, Anfrage und Antwort
+über Puffer) und/oder über einen lokalen ThreadingHTTPServer mit
+Keep-Alive-Clients. Pro Szenario werden Durchsatz, Latenz-Perzentile,
+Yahoo-Abrufe pro Anfrage (nach Art), Fehlerantworten und der
+Spitzenspeicher (tracemalloc, eigener Durchlauf) ausgegeben.
+
+Aufruf:
+    python bench/bench_suite.py [--mode inproc|http|both] [--requests 200]
+        [--concurrency 8] [--latency 20] [--scenario name ...]
+        [--record datei.jsonl]
+
+`--latency` (ms) gilt für alle Abrufe ohne eigene Latenz im Profil bzw.
+in der aufgezeichneten Fixture.
+"""
+import argparse
+import http.client
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+import fake_yfinance
+fake_yfinance.install()
+
+_tmp = tempfile.mkdtemp(prefix='stockanalyzer-suite-')
+os.environ['SYMBOL_CACHE_PATH'] = ''
+os.environ['BAR_STORE_DIR'] = _tmp
+# Nur HOT.DE vorwärmen, im Sekundentakt, damit während der Messung neu geladen wird
+os.environ.setdefault('PREWARM', '1')
+os.environ.setdefault('PREWARM_SYMBOLS', 'HOT.DE')
+os.environ.setdefault('PREWARM_OPEN_INTERVAL', '1')
+os.environ.setdefault('PREWARM_CLOSED_INTERVAL', '1')
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'api'))
+
+import logging
+logging.disable(logging.CRITICAL)
+
+import getstockdata
+
+# Name -> (Pfade, die reihum angefragt werden, kalter Start ja/nein)
+SCENARIOS = {
+    'warm-json': (['/api/getstockdata?symbol=SAP.DE&period=10y'], False),
+    'warm-binary-500': (['/api/getstockdata?symbol=LONG.DE&period=max&points=500&format=binary'], False),
+    'indicators': (['/api/getstockdata?symbol=LONG.DE&period=5y&points=500'
+                    '&indicators=sma50,sma200,ema20,rsi,macd,bb,vol,drawdown'], False),
+    'mixed-symbols': ([f'/api/getstockdata?symbol={s}&period=max' for s in
+                       ('LONG.DE', 'DIVQ', 'NODIV', 'IPO.DE', '716460', 'US5949181045')], False),
+    'cold': ([f'/api/getstockdata?symbol={s}&period=5y' for s in
+              ('SAP.DE', 'SIE.DE', 'ALV.DE', 'AAPL', 'MSFT', 'DIVQ', 'NODIV', 'IPO.DE')], True),
+    'slow-upstream': (['/api/getstockdata?symbol=SLOW.DE&period=1y'], True),
+    'prewarmed': (['/api/getstockdata?symbol=HOT.DE&period=1y'], False),
+    'failing-upstream': (['/api/getstockdata?symbol=FAIL.DE&period=1y',
+                          '/api/getstockdata?symbol=FLAKY.DE&period=1y'], True),
+    'validation': (['/api/getstockdata', '/api/getstockdata?symbol=SAP.DE&period=abc'], False),
+}
+
+
+class InProcessHandler(getstockdata.handler):
+    """Führt eine Anfrage ohne Socket aus: Request aus einem Puffer, Antwort in einen Puffer."""
+
+    def __init__(self, path, headers=None):
+        lines = [f'GET {path} HTTP/1.1', 'Host: bench']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        self.rfile = io.BytesIO(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        self.wfile = io.BytesIO()
+        self.client_address = ('127.0.0.1', 0)
+        self.server = None
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def inprocess_request(path):
+    handler = InProcessHandler(path)
+    handler.handle_one_request()
+    raw = handler.wfile.getvalue()
+    head, _, body = raw.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    return status, body
+
+
+class QuietHandler(getstockdata.handler):
+    # Header und Body gehen als getrennte write()s raus; mit Nagle wartet die
+    # zweite Hälfte auf das verzögerte ACK (~40 ms) und verfälscht die Latenz
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpClientPool:
+    """Ein Keep-Alive-Client pro Benchmark-Thread."""
+
+    def __init__(self, port):
+        self.port = port
+        self._local = threading.local()
+
+    def request(self, path):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            self._local.conn = None
+            conn.close()
+            raise
+
+
+def reset_caches():
+    """Kalter Start: leerer Kerzenspeicher, Arbeitsspeicher-Cache und Symbol-Cache, neue Indikator-Zustände."""
+    shutil.rmtree(_tmp, ignore_errors=True)
+    os.makedirs(_tmp, exist_ok=True)
+    getstockdata.MEMORY.clear()
+    getstockdata.BAR_STORE = getstockdata.LazyObject(getstockdata._bar_store)
+    getstockdata.SYMBOL_CACHE.clear()
+    getstockdata.INDICATOR_ENGINE = getstockdata.IndicatorEngine()
+
+
+def is_error(body):
+    return body[:1] == b'{' and b'"error"' in body[:200]
+
+
+def run(send, paths, requests, concurrency):
+    """Schickt `requests` Anfragen reihum über `concurrency` Threads."""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        start = time.perf_counter()
+        status, body = send(paths[i % len(paths)])
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if status != 200 or is_error(body):
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+def percentile(ordered, p):
+    return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+
+
+def scenario(name, send, requests, concurrency):
+    paths, cold = SCENARIOS[name]
+    if cold:
+        reset_caches()
+        requests = max(requests // 4, len(paths))
+    else:
+        # Aufwärmen: jede URL einmal, danach gelten nur noch die Messwerte
+        for path in paths:
+            send(path)
+    fake_yfinance.reset()
+    wall, latencies, errors = run(send, paths, requests, concurrency)
+    calls = dict(fake_yfinance.CALLS)
+
+    # Spitzenspeicher in einem eigenen, kurzen Durchlauf (tracemalloc bremst)
+    if cold:
+        reset_caches()
+    tracemalloc.start()
+    run(send, paths, min(requests, 2 * len(paths)), 1)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'scenario': name,
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / wall,
+        'p50': percentile(latencies, 50) * 1000,
+        'p95': percentile(latencies, 95) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'callsPerRequest': {kind: count / len(latencies) for kind, count in sorted(calls.items())},
+        'peakMB': peak / 1e6,
+    }
+
+
+def print_result(mode, result):
+    calls = ' '.join(f'{kind}={n:.2f}' for kind, n in result['callsPerRequest'].items()) or '-'
+    print(f"{mode:<7} {result['scenario']:<17} {result['requests']:>5} {result['errors']:>5} "
+          f"{result['throughput']:>8.1f} {result['p50']:>8.1f} {result['p95']:>8.1f} {result['p99']:>8.1f} "
+          f"{result['peakMB']:>7.1f}   {calls}")
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--mode', choices=('inproc', 'http', 'both'), default='both')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=20, help='Upstream-Latenz in ms')
+    parser.add_argument('--scenario', nargs='*', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--record', help='Ergebnis als JSON-Zeile an diese Datei anhängen')
+    args = parser.parse_args()
+
+    fake_yfinance.reset(args.latency / 1000)
+    fake_yfinance.preload()
+    modes = {}
+    server = None
+    if args.mode in ('inproc', 'both'):
+        modes['inproc'] = inprocess_request
+    if args.mode in ('http', 'both'):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), QuietHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        modes['http'] = HttpClientPool(server.server_port).request
+
+    print(f"Anfragen {args.requests}, parallel {args.concurrency}, Upstream-Latenz {args.latency:.0f} ms")
+    print(f"{'Modus':<7} {'Szenario':<17} {'Anfr.':>5} {'Fehl.':>5} {'Anfr./s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Spitze':>7}   Yahoo-Abrufe/Anfrage")
+    results = []
+    try:
+        for mode, send in modes.items():
+            for name in args.scenario:
+                result = scenario(name, send, args.requests, args.concurrency)
+                result['mode'] = mode
+                results.append(result)
+                print_result(mode, result)
+    finally:
+        getstockdata.PREWARMER.stop()
+        if server is not None:
+            server.shutdown()
+        shutil.rmtree(_tmp, ignore_errors=True)
+
+    if args.record:
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': git_commit(),
+            'args': vars(args),
+            'results': results,
+        }
+        with open(args.record, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+if __name__ == '__main__':
+    main()
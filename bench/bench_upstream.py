@@ -0,0 +1,90 @@
+"""Benchmark: Yahoo-Abrufe und Latenz pro Anfrage gegen ein lokales Fake-yfinance.
+
+Vergleicht den bisherigen Ablauf von do_GET (1d-Test, info, 2d-Fallback,
+max-Historie, dividends nacheinander) mit get_stock_data().
+
+Aufruf: python bench/bench_upstream.py [anfragen] [latenz_ms]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+import fake_yfinance
+fake_yfinance.install()
+
+# Kalte Caches in einem temporären Verzeichnis
+_tmp = tempfile.mkdtemp(prefix='stockanalyzer-bench-')
+os.environ['SYMBOL_CACHE_PATH'] = ''
+os.environ['BAR_STORE_DIR'] = _tmp
+os.environ['PREWARM'] = '0'
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'api'))
+
+import logging
+logging.disable(logging.INFO)
+
+import yfinance as yf
+import getstockdata
+from _timerange import parse_range
+
+SYMBOLS = ['SAP.DE', 'SIE.DE', 'ALV.DE', 'AAPL', 'MSFT']
+
+
+def legacy_pipeline(symbol):
+    """Upstream-Aufrufe des bisherigen do_GET für ein direkt gültiges Symbol."""
+    yf.Ticker(symbol).history(period="1d")
+    ticker = yf.Ticker(symbol)
+    info = ticker.info
+    if not info.get('currentPrice'):
+        ticker.history(period="2d")
+    ticker.history(period="max", interval="1d")
+    ticker.dividends
+
+
+def current_pipeline(symbol):
+    getstockdata.get_stock_data(symbol, parse_range({}))
+
+
+def reset_caches():
+    getstockdata.SYMBOL_CACHE.clear()
+    getstockdata.MEMORY.clear()
+    getstockdata.PREWARMER.clear()
+    for name in os.listdir(_tmp):
+        os.remove(os.path.join(_tmp, name))
+
+
+def run(label, func, requests, cold):
+    fake_yfinance.reset()
+    latencies = []
+    for i in range(requests):
+        if cold:
+            reset_caches()
+        start = time.perf_counter()
+        func(SYMBOLS[i % len(SYMBOLS)])
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    calls = sum(fake_yfinance.CALLS.values()) / requests
+    print(f"{label:<22} Abrufe/Anfrage {calls:5.2f}   "
+          f"p50 {statistics.median(latencies) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms")
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+    fake_yfinance.reset(latency)
+    # Synthetische Frames vorab erzeugen, damit sie nicht mitgemessen werden
+    for symbol in SYMBOLS:
+        fake_yfinance._frame(symbol)
+
+    print(f"{requests} Anfragen, {latency * 1000:.0f} ms simulierte Latenz pro Abruf")
+    run("bisher (seriell)", legacy_pipeline, requests, cold=True)
+    run("get_stock_data kalt", current_pipeline, requests, cold=True)
+    run("get_stock_data warm", current_pipeline, requests, cold=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""Lokaler Ersatz für yfinance für Benchmarks ohne Netzwerk.
+
+`install()` registriert das Modul als `yfinance` in sys.modules, bevor
+api/getstockdata.py importiert wird. Jeder simulierte Yahoo-Abruf wird in
+CALLS gezählt und wartet LATENCY Sekunden.
+
+Daten kommen aus bench/fixtures/ (bzw. FAKE_YFINANCE_FIXTURES):
+  - `<SYMBOL>.csv.gz` + `<SYMBOL>.json` sind mit record_fixtures.py
+    aufgezeichnete Yahoo-Antworten (Historie, info, gemessene Latenzen),
+  - `profiles.json` beschreibt synthetische Werte für Randfälle
+    (Historienlänge, Dividendenrhythmus, Währung, Börsenfeiertage als
+    MM-TT, Latenz pro Abrufart, Fehler).
+Symbole aus VALID_SYMBOLS ohne Fixture bekommen eine synthetische
+Historie mit HISTORY_ROWS Kerzen und jährlicher Dividende.
+"""
+import gzip
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+LATENCY = 0.05
+CALLS = Counter()
+VALID_SYMBOLS = {'SAP.DE', 'SIE.DE', 'ALV.DE', 'AAPL', 'MSFT'}
+HISTORY_ROWS = 10_000
+FIXTURE_DIR = os.environ.get(
+    'FAKE_YFINANCE_FIXTURES',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+)
+
+_lock = threading.Lock()
+_frames = {}
+_infos = {}
+_profiles = {}
+_random = random.Random(42)
+
+
+class UpstreamError(Exception):
+    """Simulierter Netzwerk- bzw. Yahoo-Fehler."""
+
+
+def reset(latency=None):
+    """Setzt Zähler (und optional die Latenz) zurück."""
+    global LATENCY
+    CALLS.clear()
+    _random.seed(42)
+    if latency is not None:
+        LATENCY = latency
+
+
+def load_fixtures(path=FIXTURE_DIR):
+    """Lädt Profile und aufgezeichnete Fixtures; aufgezeichnete Daten haben Vorrang."""
+    profiles_path = os.path.join(path, 'profiles.json')
+    if os.path.exists(profiles_path):
+        with open(profiles_path) as f:
+            for symbol, profile in json.load(f).items():
+                if not symbol.startswith('_'):
+                    _profiles[symbol.upper()] = profile
+    if not os.path.isdir(path):
+        return
+    for name in sorted(os.listdir(path)):
+        if not name.endswith('.csv.gz'):
+            continue
+        symbol = name[:-len('.csv.gz')].upper()
+        with open(os.path.join(path, symbol + '.json')) as f:
+            meta = json.load(f)
+        with gzip.open(os.path.join(path, name), 'rt') as f:
+            frame = pd.read_csv(f, index_col='Date')
+        index = pd.to_datetime(frame.index, utc=True).tz_convert(meta.get('timezone') or 'UTC')
+        frame.index = index.rename('Date')
+        _frames[symbol] = frame
+        _infos[symbol] = meta.get('info', {})
+        _profiles[symbol] = dict(_profiles.get(symbol, {}), latency=meta.get('latency'), recorded=True)
+
+
+def add_symbols(names, **profile):
+    """Weitere synthetische Symbole mit gemeinsamem Profil (z.B. für ein großes Universum)."""
+    for name in names:
+        _profiles[name.upper()] = dict(profile)
+
+
+def symbols():
+    """Alle Symbole, für die das Fake Daten liefert."""
+    return sorted(VALID_SYMBOLS | set(_profiles))
+
+
+def preload():
+    """Erzeugt alle synthetischen Historien vorab, damit sie nicht in Messungen fallen."""
+    for symbol in symbols():
+        _frame(symbol)
+
+
+def _valid(symbol):
+    return symbol in VALID_SYMBOLS or symbol in _profiles
+
+
+def _upstream(kind, symbol=None):
+    profile = _profiles.get(symbol, {}) if symbol else {}
+    with _lock:
+        CALLS[kind] += 1
+        flaky = _random.random() < profile.get('failRate', 0)
+    latency = (profile.get('latency') or {}).get(kind, LATENCY)
+    if latency:
+        time.sleep(latency)
+    if kind in profile.get('fail', ()) or flaky:
+        raise UpstreamError(f"{kind} für {symbol} fehlgeschlagen (simuliert)")
+
+
+def _frame(symbol):
+    """Historie aus Fixture bzw. synthetisch nach Profil, pro Symbol deterministisch."""
+    if symbol not in _frames:
+        profile = _profiles.get(symbol, {})
+        rows = profile.get('rows', HISTORY_ROWS)
+        rng = np.random.default_rng(sum(map(ord, symbol)))
+        index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=rows,
+                               tz=profile.get('timezone', 'Europe/Berlin'), name='Date')
+        if profile.get('holidays'):
+            index = index[~index.strftime('%m-%d').isin(profile['holidays'])]
+            rows = len(index)
+        close = profile.get('startPrice', 50) * np.exp(np.cumsum(rng.normal(0.0003, 0.015, rows)))
+        frame = pd.DataFrame({
+            'Open': close * 0.995, 'High': close * 1.01, 'Low': close * 0.985, 'Close': close,
+            'Volume': rng.integers(10_000, 5_000_000, rows),
+            'Dividends': 0.0, 'Stock Splits': 0.0,
+        }, index=index)
+        dividends = profile.get('dividends', {'months': [5], 'amount': 1.5})
+        if dividends:
+            paying = frame.index[frame.index.month.isin(dividends['months'])]
+            first_in_month = paying[~pd.Series(paying.year * 100 + paying.month).duplicated().to_numpy()]
+            frame.loc[first_in_month, 'Dividends'] = dividends['amount']
+        _frames[symbol] = frame
+    return _frames[symbol]
+
+
+class Ticker:
+    def __init__(self, symbol, session=None):
+        self.ticker = symbol.upper()
+
+    def history(self, period='1mo', interval='1d', start=None, end=None, actions=True, **kwargs):
+        _upstream('history', self.ticker)
+        if not _valid(self.ticker):
+            return pd.DataFrame()
+        frame = _frame(self.ticker)
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start).tz_localize(frame.index.tz)]
+        if end is not None:
+            frame = frame[frame.index < pd.Timestamp(end).tz_localize(frame.index.tz)]
+        if start is None and end is None and period != 'max':
+            days = {'1d': 1, '2d': 2, '5d': 5, '1mo': 21, '1y': 252, '5y': 1260, '10y': 2520}
+            frame = frame.iloc[-days.get(period, len(frame)):]
+        if not actions:
+            frame = frame.drop(columns=['Dividends', 'Stock Splits'])
+        return frame.copy()
+
+    @property
+    def info(self):
+        _upstream('info', self.ticker)
+        if not _valid(self.ticker):
+            return {'trailingPegRatio': None}
+        if self.ticker in _infos:
+            return dict(_infos[self.ticker])
+        profile = _profiles.get(self.ticker, {})
+        close = float(_frame(self.ticker)['Close'].iloc[-1])
+        return {
+            'longName': f'{self.ticker} Testwert', 'currency': profile.get('currency', 'EUR'),
+            'sector': 'Technology', 'currentPrice': close, 'previousClose': close * 0.99,
+            'dividendYield': 1.2 if profile.get('dividends', True) else None,
+        }
+
+    @property
+    def dividends(self):
+        _upstream('dividends', self.ticker)
+        if not _valid(self.ticker):
+            return pd.Series(dtype='float64')
+        dividends = _frame(self.ticker)['Dividends']
+        return dividends[dividends > 0]
+
+
+def search(query, max_results=3):
+    _upstream('search')
+    return pd.DataFrame()
+
+
+def download(tickers, group_by='column', **kwargs):
+    _upstream('download')
+    if isinstance(tickers, str):
+        tickers = tickers.split()
+    frames = {}
+    for symbol in tickers:
+        if _valid(symbol.upper()):
+            frames[symbol] = Ticker.history(Ticker(symbol), **{
+                k: v for k, v in kwargs.items() if k in ('period', 'interval', 'start', 'end', 'actions')
+            })
+            # Wie yfinance (ignore_tz): Tageskerzen mehrerer Börsen mit lokalen Daten ohne Zeitzone
+            if kwargs.get('interval', '1d')[-1] not in ('m', 'h'):
+                frames[symbol].index = frames[symbol].index.tz_localize(None)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1)
+
+
+def install():
+    """Ersetzt yfinance für alle folgenden Imports durch dieses Modul."""
+    sys.modules['yfinance'] = sys.modules[__name__]
+
+
+load_fixtures()
@@ -0,0 +1,93 @@
+"""Zeichnet Yahoo-Antworten als Fixtures für bench/fake_yfinance.py auf.
+
+Pro Symbol entstehen in bench/fixtures/ (bzw. dem Zielverzeichnis)
+  - `<SYMBOL>.csv.gz`: volle Tageshistorie inkl. Dividenden und Splits,
+  - `<SYMBOL>.json`: ticker.info, Zeitzone und die gemessenen Latenzen
+    von info und history, die das Fake beim Abspielen nachstellt.
+
+Benötigt Netzwerkzugriff und das echte yfinance.
+
+Aufruf: python bench/record_fixtures.py SAP.DE ALV.DE MSFT [--out verzeichnis]
+"""
+import gzip
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import yfinance as yf
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _json_safe(value):
+    """Nur JSON-taugliche info-Werte übernehmen (keine NaN, keine Objekte)."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    return str(value)
+
+
+def record(symbol, out_dir):
+    ticker = yf.Ticker(symbol)
+
+    start = time.perf_counter()
+    info = ticker.info
+    info_latency = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hist = ticker.history(period='max', interval='1d', actions=True)
+    history_latency = time.perf_counter() - start
+    if hist.empty:
+        raise ValueError(f"Keine Historie für {symbol}")
+
+    tz = str(hist.index.tz) if hist.index.tz is not None else None
+    frame = hist.copy()
+    # ISO mit Offset, damit das Fake die lokale Börsenzeit wiederherstellt
+    frame.index = frame.index.map(lambda ts: ts.isoformat())
+    frame.index.name = 'Date'
+    with gzip.open(os.path.join(out_dir, f'{symbol}.csv.gz'), 'wt') as f:
+        frame.to_csv(f)
+
+    meta = {
+        'symbol': symbol,
+        'recorded': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'timezone': tz,
+        'latency': {'info': round(info_latency, 3), 'history': round(history_latency, 3)},
+        'info': _json_safe(dict(info)),
+    }
+    with open(os.path.join(out_dir, f'{symbol}.json'), 'w') as f:
+        json.dump(meta, f, indent=1, sort_keys=True)
+    return len(hist), info_latency, history_latency
+
+
+def main():
+    args = sys.argv[1:]
+    out_dir = os.path.join(BENCH_DIR, 'fixtures')
+    if '--out' in args:
+        i = args.index('--out')
+        out_dir = args[i + 1]
+        del args[i:i + 2]
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    os.makedirs(out_dir, exist_ok=True)
+    for symbol in args:
+        try:
+            rows, info_latency, history_latency = record(symbol.upper(), out_dir)
+        except Exception as e:
+            print(f"{symbol:<10} Fehler: {e}")
+            continue
+        print(f"{symbol:<10} {rows:>6} Kerzen   info {info_latency * 1000:6.0f} ms   "
+              f"history {history_latency * 1000:6.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
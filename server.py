@@ -0,0 +1,292 @@
+"""Selbst gehosteter asyncio-Server für die API-Funktionen (außerhalb von Vercel).
+
+Bedient dieselben Endpunkte wie die Vercel-Funktionen in api/ mit deren
+unveränderten Handler-Klassen:
+  - Verbindungen laufen in der Event-Loop (HTTP/1.1 Keep-Alive, viele
+    gleichzeitige Clients ohne Thread pro Verbindung),
+  - die blockierende Arbeit (yfinance, pandas) läuft in einem begrenzten
+    Thread-Pool; Antworten gehen über die Loop mit drain() hinaus,
+  - ist der Pool samt Warteschlange voll, kommt sofort 503 mit Retry-After,
+  - alle Yahoo-Abrufe teilen sich eine HTTP-Session (Verbindungen zu Yahoo
+    bleiben pro Worker-Thread offen).
+
+Aufruf: python server.py [--host 127.0.0.1] [--port 8000] [--workers 32]
+        [--queue 1024] [--access-log]
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import signal
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'api'))
+from _http import CORS_HEADERS
+
+logger = logging.getLogger('server')
+
+# Gleichzeitig bearbeitete Anfragen und wartende Anfragen darüber hinaus
+DEFAULT_WORKERS = int(os.environ.get('SERVER_WORKERS', 32))
+DEFAULT_QUEUE = int(os.environ.get('SERVER_QUEUE', 1024))
+# Sekunden, die eine Keep-Alive-Verbindung ohne neue Anfrage offen bleibt
+KEEPALIVE_TIMEOUT = float(os.environ.get('SERVER_KEEPALIVE', 15))
+# Obergrenze für Anfragezeile plus Header
+MAX_HEAD_SIZE = 64 * 1024
+# Ab dieser Puffergröße schreibt ein Handler-Thread sofort (Streaming)
+FLUSH_SIZE = 64 * 1024
+# Pfad -> Modul in api/
+ROUTES = {
+    '/api/getstockdata': 'getstockdata',
+    '/api/getstockbatch': 'getstockbatch',
+    '/api/search': 'search',
+    '/api/screener': 'screener',
+    '/api/compare': 'compare',
+}
+
+
+def upstream_session():
+    """Eine curl_cffi-Session wie die von yfinance, gemeinsam für alle Abrufe.
+
+    curl_cffi hält pro Thread ein Curl-Handle mit eigenem Verbindungs-Cache,
+    bei festen Worker-Threads bleiben die Verbindungen zu Yahoo also offen.
+    Ohne curl_cffi (None) bleibt es beim Standard von yfinance.
+    """
+    try:
+        from curl_cffi import requests as curl_requests
+    except ImportError:
+        return None
+    return curl_requests.Session(impersonate='chrome')
+
+
+class _LoopWriter:
+    """wfile für Handler-Threads: puffert und schreibt über die Event-Loop.
+
+    flush() wartet, bis der Transport die Daten abgenommen hat (drain), so
+    bremst ein langsamer Client den Thread statt den Speicher zu füllen.
+    """
+
+    def __init__(self, writer, loop):
+        self._writer = writer
+        self._loop = loop
+        self._buffer = bytearray()
+
+    def write(self, data):
+        self._buffer += data
+        if len(self._buffer) >= FLUSH_SIZE:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if not self._buffer:
+            return
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        asyncio.run_coroutine_threadsafe(self._send(data), self._loop).result()
+
+    async def _send(self, data):
+        self._writer.write(data)
+        await self._writer.drain()
+
+
+class _LoopRequest:
+    """Mixin: führt einen BaseHTTPRequestHandler ohne Socket aus.
+
+    Die Anfrage (Zeile und Header) wurde bereits von der Loop gelesen und
+    kommt als Bytes, die Antwort geht an einen _LoopWriter.
+    """
+    access_log = False
+
+    def __init__(self, head, wfile, client_address):
+        self.rfile = io.BytesIO(head)
+        self.wfile = wfile
+        self.client_address = client_address
+        self.server = None
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        if self.access_log:
+            logger.info(f"{self.client_address[0]} {format % args}")
+
+
+def _adapt(handler_class, access_log):
+    return type(handler_class.__name__, (_LoopRequest, handler_class), {'access_log': access_log})
+
+
+class AsyncServer:
+    def __init__(self, workers=DEFAULT_WORKERS, queue=DEFAULT_QUEUE, access_log=False):
+        import importlib
+        self.workers = workers
+        self.queue = queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+        self.handlers = {
+            path: _adapt(importlib.import_module(module).handler, access_log)
+            for path, module in ROUTES.items()
+        }
+        self.pending = 0
+        self.rejected = 0
+        self.connections = 0
+
+    async def serve_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        peer = writer.get_extra_info('peername') or ('-', 0)
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send_error(writer, 431, 'Anfrage-Header zu groß.', keep_alive=False)
+                    break
+                if not await self._discard_body(reader, head):
+                    break
+                if not await self.dispatch(head, writer, peer, loop):
+                    break
+        except ConnectionError:
+            pass
+        except Exception as e:
+            logger.error(f"Fehler in Verbindung {peer[0]}: {e}", exc_info=True)
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def dispatch(self, head, writer, peer, loop):
+        """Bearbeitet eine Anfrage; True, wenn die Verbindung offen bleiben soll."""
+        try:
+            target = head.split(b' ', 2)[1].decode('latin-1')
+        except IndexError:
+            await self._send_error(writer, 400, 'Ungültige Anfrage.', keep_alive=False)
+            return False
+        keep_alive = _wants_keep_alive(head)
+        path = urlsplit(target).path.rstrip('/') or '/'
+        handler_class = self.handlers.get(path)
+        if handler_class is None:
+            if path in ('/', '/index.html'):
+                await self._send_file(writer, os.path.join(ROOT_DIR, 'index.html'), keep_alive)
+                return keep_alive
+            await self._send_error(writer, 404, f"Unbekannter Pfad: {path}", keep_alive)
+            return keep_alive
+
+        # Gegendruck: über Pool plus Warteschlange hinaus sofort ablehnen
+        if self.pending >= self.workers + self.queue:
+            self.rejected += 1
+            await self._send_error(writer, 503, 'Server ausgelastet, bitte erneut versuchen.', keep_alive,
+                                   {'Retry-After': '1'})
+            return keep_alive
+        self.pending += 1
+        try:
+            close = await loop.run_in_executor(self.executor, _run_handler, handler_class, head,
+                                               _LoopWriter(writer, loop), peer)
+        finally:
+            self.pending -= 1
+        return not close
+
+    async def _discard_body(self, reader, head):
+        """Liest einen (bei GET unüblichen) Body, damit die nächste Anfrage sauber beginnt."""
+        for line in head.split(b'\r\n')[1:]:
+            name, _, value = line.partition(b':')
+            if name.strip().lower() == b'content-length':
+                try:
+                    await reader.readexactly(int(value))
+                except (ValueError, asyncio.IncompleteReadError):
+                    return False
+        return True
+
+    async def _send_error(self, writer, status, message, keep_alive, headers=None):
+        body = json.dumps({'error': message}).encode('utf-8')
+        await self._send(writer, status, body, 'application/json', keep_alive, headers)
+
+    async def _send_file(self, writer, path, keep_alive):
+        with open(path, 'rb') as f:
+            body = f.read()
+        await self._send(writer, 200, body, 'text/html; charset=utf-8', keep_alive)
+
+    async def _send(self, writer, status, body, content_type, keep_alive, headers=None):
+        reason = BaseHTTPRequestHandler.responses.get(status, ('',))[0]
+        lines = [f'HTTP/1.1 {status} {reason}', f'Content-Type: {content_type}',
+                 f'Content-Length: {len(body)}', f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f'{name}: {value}' for name, value in dict(CORS_HEADERS, **(headers or {})).items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    def stats(self):
+        return {'connections': self.connections, 'pending': self.pending, 'rejected': self.rejected}
+
+
+def _wants_keep_alive(head):
+    lines = head.split(b'\r\n')
+    version = lines[0].rsplit(b' ', 1)[-1]
+    connection = b''
+    for line in lines[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'connection':
+            connection = value.strip().lower()
+    if version == b'HTTP/1.1':
+        return connection != b'close'
+    return connection == b'keep-alive'
+
+
+def _run_handler(handler_class, head, wfile, peer):
+    """Im Worker-Thread: Anfrage mit dem Vercel-Handler bearbeiten; True = Verbindung schließen."""
+    handler = handler_class(head, wfile, peer)
+    handler.handle_one_request()
+    wfile.flush()
+    return handler.close_connection
+
+
+async def serve(host='127.0.0.1', port=8000, workers=DEFAULT_WORKERS, queue=DEFAULT_QUEUE,
+                access_log=False, ready=None):
+    """Startet den Server und läuft bis SIGINT/SIGTERM (bzw. Abbruch der Task)."""
+    import getstockdata
+    session = upstream_session()
+    if session is not None:
+        getstockdata.UPSTREAM_SESSION = session
+    # Langlebiger Prozess: Vorwärmen standardmäßig an (PREWARM=0 schaltet ab)
+    if os.environ.get('PREWARM', '1') != '0':
+        getstockdata.PREWARMER.enable()
+
+    app = AsyncServer(workers, queue, access_log)
+    server = await asyncio.start_server(app.serve_connection, host, port, backlog=1024,
+                                        limit=MAX_HEAD_SIZE)
+    port = server.sockets[0].getsockname()[1]
+    logger.info(f"Server läuft auf http://{host}:{port} ({workers} Worker, Warteschlange {queue})")
+    if ready is not None:
+        ready(port)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Nicht im Haupt-Thread bzw. nicht unterstützt: Abbruch nur über die Task
+            pass
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        getstockdata.PREWARMER.stop()
+        app.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8000)))
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--queue', type=int, default=DEFAULT_QUEUE)
+    parser.add_argument('--access-log', action='store_true')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(args.host, args.port, args.workers, args.queue, args.access_log))
+
+
+if __name__ == '__main__':
+    main()